@@ -1,24 +1,292 @@
 """The Felicity Solar integration."""
 from __future__ import annotations
 
+import logging
+import secrets
+from datetime import timedelta
+from typing import Any, Dict
+
+from homeassistant.components import webhook
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.typing import ConfigType
+
+from .account import async_acquire_account, async_pop_flow_client, async_release_account
+from .archive import SnapshotArchive
+from .cassette import CassetteRecorder, CassetteReplaySession
+from .const import (
+    DOMAIN,
+    CONF_DEVICES,
+    CONF_IGNORED_DEVICES,
+    CONF_WEBHOOK_ID,
+    CONF_RECORD_CASSETTE,
+    CONF_REPLAY_CASSETTE,
+    CONF_REPLAY_SPEED,
+    CONF_REPLAY_MULTIPLIER,
+    DISCOVERY_INTERVAL,
+    CONF_ARCHIVE,
+    CONF_ARCHIVE_RETENTION_DAYS,
+    DEFAULT_ARCHIVE_RETENTION_DAYS,
+    ARCHIVE_DIRECTORY,
+    CONF_RELAY,
+    CONF_RELAY_TOKEN,
+    CONF_UPSTREAM_RELAY_URL,
+    CONF_UPSTREAM_RELAY_TOKEN,
+)
+from .coordinator import (
+    FelicitySolarCoordinator,
+    get_max_in_flight,
+    get_poll_intervals,
+    get_push_devices,
+    get_statistics_rollup,
+    get_burst_options,
+    get_stale_window,
+    get_reload_options,
+    plant_identifier,
+)
+from .relay import (
+    RelaySubscriber,
+    async_close_relay_connections,
+    async_get_relay_state,
+    async_register_relay_view,
+)
+from .services import async_setup_services
+from .webhook import async_register_webhook
+from .websocket_api import async_register_websocket_commands
 
-from .const import DOMAIN
+_LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Felicity Solar services."""
+    await async_setup_services(hass)
+    async_register_relay_view(hass)
+    async_register_websocket_commands(hass)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Felicity Solar from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
-    
+
+    username = entry.data.get("username")
+    password_hash = entry.data.get("password_hash")
+    # Taken by every setup attempt, so it never outlives a setup that fails or aborts early
+    flow_client = async_pop_flow_client(hass, username)
+
+    relay_url = entry.options.get(CONF_UPSTREAM_RELAY_URL)
+    replay_path = entry.options.get(CONF_REPLAY_CASSETTE)
+    # Relay clients need no account: the upstream relay polls the cloud, and entries
+    # created through the relay step of the config flow have no credentials at all
+    account = None
+    if replay_path and not relay_url:
+        # Serve recorded traffic instead of calling the cloud
+        try:
+            session = await hass.async_add_executor_job(
+                CassetteReplaySession,
+                hass.config.path(replay_path),
+                entry.options.get(CONF_REPLAY_SPEED, 1.0),
+                entry.options.get(CONF_REPLAY_MULTIPLIER, 1),
+            )
+        except Exception:
+            _LOGGER.exception(f"Error loading cassette {replay_path}")
+            return False
+        account = async_acquire_account(hass, username, password_hash, session=session)
+    elif not relay_url:
+        # Entries on the same account share one client, token and connection pool
+        account = async_acquire_account(hass, username, password_hash, client=flow_client)
+
+    if entry.options.get(CONF_RECORD_CASSETTE) and account is not None:
+        await _async_start_recording(hass, entry, account)
+
+    _LOGGER.info("Starting Felicity Solar setup...")
+
+    if relay_url:
+        # The upstream relay polls the cloud; its inventory and snapshots replace ours
+        relay_token = entry.options.get(CONF_UPSTREAM_RELAY_TOKEN, "")
+        try:
+            relay_state = await async_get_relay_state(hass, relay_url, relay_token)
+        except Exception as e:
+            # Home Assistant retries the setup until the relay is reachable
+            raise ConfigEntryNotReady(f"Error getting state from relay {relay_url}: {e}") from e
+        ignored_devices = set(entry.data.get(CONF_IGNORED_DEVICES, []))
+        devices_info = [device for device in relay_state.get("devices", []) if device.get("deviceSn") not in ignored_devices]
+    else:
+        # Use the inventory selected in the config flow, falling back to discovery for older entries.
+        # Replays always use the recorded inventory, including any synthetic devices.
+        devices_info = [] if replay_path else [dict(device) for device in entry.data.get(CONF_DEVICES, [])]
+    if not devices_info and not relay_url:
+        try:
+            devices_info = await account.async_get_devices_info()
+            _LOGGER.info(f"Retrieved device info: {devices_info}")
+        except Exception as e:
+            # Usually a transient cloud or network error; Home Assistant retries the setup
+            async_release_account(hass, account)
+            raise ConfigEntryNotReady(f"Error getting device info: {e}") from e
+
+    if not devices_info:
+        if account is not None:
+            async_release_account(hass, account)
+        raise ConfigEntryNotReady("Could not get any device information from API")
+
+    if CONF_WEBHOOK_ID not in entry.data:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_WEBHOOK_ID: webhook.async_generate_id()}
+        )
+    if CONF_RELAY_TOKEN not in entry.data:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_RELAY_TOKEN: secrets.token_urlsafe(32)}
+        )
+
+    archive = None
+    if entry.options.get(CONF_ARCHIVE):
+        archive = SnapshotArchive(
+            hass.config.path(ARCHIVE_DIRECTORY, entry.entry_id),
+            entry.options.get(CONF_ARCHIVE_RETENTION_DAYS, DEFAULT_ARCHIVE_RETENTION_DAYS),
+        )
+
+    coordinator = FelicitySolarCoordinator(
+        hass,
+        account,
+        devices_info,
+        get_poll_intervals(entry),
+        get_push_devices(entry),
+        get_max_in_flight(entry),
+        get_statistics_rollup(entry),
+        get_burst_options(entry),
+        archive,
+        get_stale_window(entry),
+    )
+    coordinator.reload_options = get_reload_options(entry)
+    coordinator.push_all = bool(relay_url)
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+
+    # Entities come up with restored values; the first refresh runs once startup has completed
+    @callback
+    def _async_start_polling(hass: HomeAssistant) -> None:
+        coordinator.async_start()
+
+    entry.async_on_unload(async_at_started(hass, _async_start_polling))
+
+    if relay_url:
+        # Follow the relay's inventory and snapshots instead of rediscovering from the cloud
+        @callback
+        def _async_relay_devices(devices_info) -> None:
+            added, removed = coordinator.async_apply_inventory(devices_info, ignored_devices)
+            if added or removed:
+                _async_store_devices(hass, entry, coordinator)
+
+        # Subscribe once startup has completed, like polling, so every entity receives the initial state
+        subscriber = RelaySubscriber(hass, coordinator, relay_url, relay_token, _async_relay_devices)
+
+        @callback
+        def _async_start_subscriber(hass: HomeAssistant) -> None:
+            subscriber.async_start()
+
+        entry.async_on_unload(async_at_started(hass, _async_start_subscriber))
+        entry.async_on_unload(subscriber.async_stop)
+    else:
+        # Pick up commissioned and removed devices without reloading the entry
+        async def _async_rediscover(_now) -> None:
+            await _async_rediscover_devices(hass, entry, coordinator, persist=not replay_path)
+
+        entry.async_on_unload(
+            async_track_time_interval(hass, _async_rediscover, timedelta(seconds=DISCOVERY_INTERVAL))
+        )
+
+    if entry.options.get(CONF_RELAY):
+        @callback
+        def _async_close_relay() -> None:
+            async_close_relay_connections(hass, entry.entry_id)
+
+        entry.async_on_unload(_async_close_relay)
+
+    async_register_webhook(hass, entry, coordinator)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    _async_migrate_plant_devices(hass, entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
+@callback
+def _async_migrate_plant_devices(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Scope plant devices registered under the old account-wide identifier to this entry."""
+    device_registry = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        for domain, identifier in device.identifiers:
+            if domain == DOMAIN and identifier.startswith("plant_"):
+                plant_id = identifier[len("plant_"):]
+                device_registry.async_update_device(
+                    device.id, new_identifiers={(DOMAIN, plant_identifier(entry.entry_id, plant_id))}
+                )
+                break
+
+async def _async_rediscover_devices(hass: HomeAssistant, entry: ConfigEntry, coordinator: FelicitySolarCoordinator, persist: bool = True) -> None:
+    """Apply inventory changes of the account to a running entry."""
+    try:
+        added, removed = await coordinator.async_discover_devices(set(entry.data.get(CONF_IGNORED_DEVICES, [])))
+    except Exception as e:
+        _LOGGER.error(f"Error rediscovering devices: {e}")
+        return
+
+    if (added or removed) and persist:
+        _async_store_devices(hass, entry, coordinator)
+
+@callback
+def _async_store_devices(hass: HomeAssistant, entry: ConfigEntry, coordinator: FelicitySolarCoordinator) -> None:
+    """Keep the stored inventory in sync so the next setup starts from it."""
+    devices = [
+        {key: value for key, value in device.items() if key != "device_name"}
+        for device in coordinator.devices.values()
+    ]
+    hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_DEVICES: devices})
+
+async def _async_start_recording(hass: HomeAssistant, entry: ConfigEntry, account) -> None:
+    """Record the account's API traffic to a cassette until the entry unloads."""
+    path = hass.config.path(f"felicity_solar_{entry.entry_id}.jsonl")
+    recorder = await hass.async_add_executor_job(CassetteRecorder, path)
+
+    @callback
+    def _async_record(endpoint: str, payload: Dict[str, Any], data: Dict[str, Any]) -> None:
+        hass.async_add_executor_job(recorder.record, endpoint, payload, data)
+
+    account.client.recorder = _async_record
+    _LOGGER.info(f"Recording Felicity Solar API traffic to {path}")
+
+    @callback
+    def _async_stop_recording() -> None:
+        if account.client.recorder is _async_record:
+            account.client.recorder = None
+        hass.async_add_executor_job(recorder.close)
+
+    entry.async_on_unload(_async_stop_recording)
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator."""
+    coordinator: FelicitySolarCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if coordinator.reload_options != get_reload_options(entry):
+        # Recording, replay and statistics rollups are wired in at setup
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+    coordinator.async_set_intervals(get_poll_intervals(entry))
+    coordinator.async_set_push_devices(get_push_devices(entry))
+    coordinator.async_set_max_in_flight(get_max_in_flight(entry))
+    coordinator.async_set_burst_options(get_burst_options(entry))
+    coordinator.async_set_stale_window(get_stale_window(entry))
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
-    return unload_ok
\ No newline at end of file
+        coordinator: FelicitySolarCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+        if coordinator.account is not None:
+            async_release_account(hass, coordinator.account)
+    return unload_ok
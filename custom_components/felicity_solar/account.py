@@ -0,0 +1,99 @@
+"""Per-account API clients shared by every config entry of the same username."""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .client import FelicitySolarClient
+from .const import DOMAIN, ACCOUNTS, FLOW_AUTH
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FelicitySolarAccount:
+    """API access for one Felicity Solar account.
+
+    All entries of the account share the client with its token, the connection pool
+    and any snapshot request already in flight for a device. The client logs in on
+    first use and again whenever the API rejects the token.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: FelicitySolarClient):
+        self.hass = hass
+        self.client = client
+        self.ref_count = 0
+        self._pending_snapshots: Dict[str, asyncio.Future] = {}
+
+    async def async_get_devices_info(self) -> List[Dict[str, Any]]:
+        """Get all plants and devices of the account, or an empty list on errors."""
+        try:
+            return await self.client.get_devices_info()
+        except Exception as e:
+            _LOGGER.error(f"Error getting devices info: {e}")
+            return []
+
+    async def async_get_snapshot(self, device_sn: str, device_type: str) -> Optional[Dict[str, Any]]:
+        """Get a device snapshot, joining a request already in flight for the same device."""
+        pending = self._pending_snapshots.get(device_sn)
+        if pending is None:
+            pending = self.hass.async_create_task(self._async_fetch_snapshot(device_sn, device_type))
+            self._pending_snapshots[device_sn] = pending
+            pending.add_done_callback(lambda _: self._pending_snapshots.pop(device_sn, None))
+        # Shield so one cancelled caller does not abort the request for the others
+        return await asyncio.shield(pending)
+
+    async def _async_fetch_snapshot(self, device_sn: str, device_type: str) -> Optional[Dict[str, Any]]:
+        """Request a device snapshot."""
+        try:
+            return await self.client.get_device_snapshot(device_sn, device_type)
+        except Exception as e:
+            _LOGGER.error(f"Error updating device {device_sn}: {e}")
+            return None
+
+
+@callback
+def async_pop_flow_client(hass: HomeAssistant, username: Optional[str]) -> Optional[FelicitySolarClient]:
+    """Take the client the config flow logged in for an account, if it left one."""
+    return hass.data.get(DOMAIN, {}).get(FLOW_AUTH, {}).pop(username, None)
+
+
+@callback
+def async_acquire_account(hass: HomeAssistant, username: str, password_hash: str, session=None, client: Optional[FelicitySolarClient] = None) -> FelicitySolarAccount:
+    """Return the shared client for an account, creating it on first use.
+
+    A custom ``session`` (such as a cassette replay) gets a private client that is
+    never shared with entries talking to the real API. ``client`` is one already
+    logged in, such as the config flow's, reused when the account has no client yet.
+    """
+    if session is not None:
+        account = FelicitySolarAccount(hass, FelicitySolarClient(username, password_hash, session=session))
+        account.ref_count = 1
+        return account
+
+    accounts: Dict[str, FelicitySolarAccount] = hass.data.setdefault(DOMAIN, {}).setdefault(ACCOUNTS, {})
+    account = accounts.get(username)
+
+    if account is None or not account.client.matches(username, password_hash):
+        if client is None or not client.matches(username, password_hash):
+            client = FelicitySolarClient(username, password_hash, session=async_get_clientsession(hass))
+        if account is not None:
+            _LOGGER.warning(f"Credentials changed for {username}, replacing the shared client")
+        account = FelicitySolarAccount(hass, client)
+        accounts[username] = account
+
+    account.ref_count += 1
+    return account
+
+
+@callback
+def async_release_account(hass: HomeAssistant, account: FelicitySolarAccount) -> None:
+    """Drop one reference to a shared client and close it when unused."""
+    account.ref_count -= 1
+    if account.ref_count > 0:
+        return
+
+    accounts: Dict[str, FelicitySolarAccount] = hass.data.get(DOMAIN, {}).get(ACCOUNTS, {})
+    if accounts.get(account.client.username) is account:
+        accounts.pop(account.client.username)
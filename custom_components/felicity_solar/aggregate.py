@@ -0,0 +1,105 @@
+"""Plant-level aggregates computed from already fetched device snapshots.
+
+This stays a plain loop although numpy is a requirement of the integration (for
+string health and the archive): every field needs its own None handling and plant
+grouping, and one pass over a fleet's snapshots per sweep is already cheap.
+"""
+from typing import AbstractSet, Any, Dict
+
+from .util import to_float
+
+# Aggregate key -> snapshot field summed over the current devices of a plant
+PLANT_SUM_FIELDS = {
+    "pv_power": "pvTotalPower",
+    "load_power": "acTotalOutActPower",
+    "grid_power": "acRInPower",
+    "meter_power": "meterPower",
+    "battery_power": "bmsPower",
+}
+
+# Aggregate key -> energy counter summed over every device of a plant, including stale
+# ones at their last reading, so a missed poll never looks like a meter reset
+PLANT_COUNTER_FIELDS = {
+    "today_energy": "ePvToday",
+    "total_energy": "totalEnergy",
+}
+
+# Aggregate key -> snapshot field whose maximum over the plant is reported
+PLANT_MAX_FIELDS = {
+    "temp_max": "tempMax",
+    "device_temp_max": "devTempMax",
+}
+
+
+def compute_plant_aggregates(devices: Dict[str, Dict[str, Any]], snapshots: Dict[str, Dict[str, Any]], stale: AbstractSet[str] = frozenset()) -> Dict[Any, Dict[str, Any]]:
+    """Return the aggregates of every plant in one pass over the device snapshots.
+
+    Battery SoC is weighted by each device's ``batteryCapacity``; when no device of
+    a plant reports a capacity the plain mean of the reported SoC values is used.
+    A field no device of the plant reports is None rather than a false zero.
+
+    Devices in ``stale`` are served from their cached snapshot: they only contribute
+    their last energy counters. The counters of a plant with a device that has no
+    snapshot at all are None, since any partial sum would drop and jump back.
+    """
+    aggregates: Dict[Any, Dict[str, Any]] = {}
+    soc_totals: Dict[Any, list] = {}
+    incomplete = set()
+
+    for device_sn, device in devices.items():
+        plant_id = device.get("plantId")
+        snapshot = snapshots.get(device_sn)
+        if not snapshot:
+            incomplete.add(plant_id)
+            continue
+
+        plant = aggregates.get(plant_id)
+        if plant is None:
+            plant = {key: None for key in (*PLANT_SUM_FIELDS, *PLANT_COUNTER_FIELDS, *PLANT_MAX_FIELDS)}
+            plant["battery_soc"] = None
+            plant["device_count"] = 0
+            aggregates[plant_id] = plant
+            # weighted SoC sum, capacity sum, plain SoC sum, SoC count
+            soc_totals[plant_id] = [0.0, 0.0, 0.0, 0]
+
+        for key, field in PLANT_COUNTER_FIELDS.items():
+            value = to_float(snapshot.get(field))
+            if value is not None:
+                plant[key] = value if plant[key] is None else plant[key] + value
+
+        if device_sn in stale:
+            continue
+
+        plant["device_count"] += 1
+
+        for key, field in PLANT_SUM_FIELDS.items():
+            value = to_float(snapshot.get(field))
+            if value is not None:
+                plant[key] = value if plant[key] is None else plant[key] + value
+
+        for key, field in PLANT_MAX_FIELDS.items():
+            value = to_float(snapshot.get(field))
+            if value is not None and (plant[key] is None or value > plant[key]):
+                plant[key] = value
+
+        soc = to_float(snapshot.get("battSoc"))
+        if soc is not None:
+            totals = soc_totals[plant_id]
+            capacity = to_float(device.get("batteryCapacity")) or 0.0
+            if capacity > 0:
+                totals[0] += soc * capacity
+                totals[1] += capacity
+            totals[2] += soc
+            totals[3] += 1
+
+    for plant_id in incomplete & aggregates.keys():
+        for key in PLANT_COUNTER_FIELDS:
+            aggregates[plant_id][key] = None
+
+    for plant_id, (weighted_soc, capacity, soc_sum, soc_count) in soc_totals.items():
+        if capacity > 0:
+            aggregates[plant_id]["battery_soc"] = round(weighted_soc / capacity, 1)
+        elif soc_count:
+            aggregates[plant_id]["battery_soc"] = round(soc_sum / soc_count, 1)
+
+    return aggregates
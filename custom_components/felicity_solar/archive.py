@@ -0,0 +1,182 @@
+"""On-disk columnar archive of raw snapshots with memory-mapped range reads.
+
+Layout: ``<root>/<device_sn>/<YYYY-MM-DD>/<column>.f64``. Each daily segment holds
+one file per column of little-endian float64 values, row-aligned with the
+``timestamp`` column (UTC epoch seconds). Appending never rewrites a file, and reads
+memory-map only the segments and columns a query touches.
+"""
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .util import to_float
+
+_LOGGER = logging.getLogger(__name__)
+
+# Numeric snapshot fields kept in the archive, also the query_archive options in services.yaml
+ARCHIVE_FIELDS = (
+    "pvTotalPower", "pvPower", "pv2Power", "pv3Power", "pv4Power",
+    "pvVolt", "pv2Volt", "pv3Volt", "pvInCurr", "pv2InCurr", "pv3InCurr",
+    "acRInVolt", "acRInCurr", "acRInFreq", "acRInPower",
+    "acROutVolt", "acROutCurr", "acROutFreq", "acTotalOutActPower",
+    "totalEnergy", "ePvToday", "eGridFeedToday", "eGridFeedTotal",
+    "tempMax", "devTempMax", "loadPercent", "meterPower", "wifiSignal",
+    "battSoc", "battVolt", "battCurr", "bmsPower",
+)
+
+TIMESTAMP_COLUMN = "timestamp"
+COLUMN_SUFFIX = ".f64"
+COLUMN_DTYPE = np.dtype("<f8")
+
+
+def _segment_name(timestamp: float) -> str:
+    """Return the daily segment (UTC date) a timestamp belongs to."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class SnapshotArchive:
+    """Append-only per-device columnar store of snapshots.
+
+    ``append`` only buffers rows in memory and is safe to call from the event loop;
+    ``flush`` and ``query`` do the file work and belong in an executor. Concurrent
+    flushes run one after the other, so segment files are never appended to twice at once.
+    """
+
+    def __init__(self, root: str, retention_days: int = 0):
+        self.root = root
+        self._retention_days = retention_days
+        # Guards the pending buffer
+        self._lock = threading.Lock()
+        # Held for a whole flush
+        self._write_lock = threading.Lock()
+        # Device serial -> buffered (timestamp, values) rows not yet on disk
+        self._pending: Dict[str, List[Tuple[float, List[float]]]] = {}
+
+    def append(self, device_sn: str, timestamp: float, snapshot: Dict[str, Any]) -> None:
+        """Buffer one snapshot for the next flush."""
+        row = [to_float(snapshot.get(field), np.nan) for field in ARCHIVE_FIELDS]
+        with self._lock:
+            self._pending.setdefault(device_sn, []).append((timestamp, row))
+
+    def flush(self) -> int:
+        """Write the buffered rows to their daily segments and return how many were written."""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+
+            written = 0
+            for device_sn, rows in pending.items():
+                segments: Dict[str, List[Tuple[float, List[float]]]] = {}
+                for row in rows:
+                    segments.setdefault(_segment_name(row[0]), []).append(row)
+                for segment, segment_rows in segments.items():
+                    try:
+                        self._write_segment(self._segment_path(device_sn, segment), segment_rows)
+                        written += len(segment_rows)
+                    except OSError as e:
+                        _LOGGER.error(f"Error archiving snapshots of {device_sn}: {e}")
+
+            if self._retention_days:
+                self._expire()
+            return written
+
+    def query(self, device_sn: str, start: float, end: float, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return the archived rows of a device with ``start <= timestamp < end``.
+
+        The result is ``{"timestamps": [...], "fields": {field: [...]}}`` with missing
+        values as None.
+        """
+        fields = [field for field in (fields or ARCHIVE_FIELDS) if field in ARCHIVE_FIELDS]
+        timestamps: List[np.ndarray] = []
+        columns: Dict[str, List[np.ndarray]] = {field: [] for field in fields}
+
+        for segment_path in self._segments_in_range(device_sn, start, end):
+            segment_timestamps = self._map_column(segment_path, TIMESTAMP_COLUMN)
+            if segment_timestamps is None or not len(segment_timestamps):
+                continue
+            # Rows are appended in time order, so the range is found by bisection
+            first = int(np.searchsorted(segment_timestamps, start, side="left"))
+            last = int(np.searchsorted(segment_timestamps, end, side="left"))
+            if first >= last:
+                continue
+            timestamps.append(np.array(segment_timestamps[first:last]))
+            for field in fields:
+                column = self._map_column(segment_path, field)
+                values = np.full(last - first, np.nan)
+                if column is not None:
+                    available = column[first:min(last, len(column))]
+                    values[:len(available)] = available
+                columns[field].append(values)
+
+        all_timestamps = np.concatenate(timestamps) if timestamps else np.empty(0)
+        return {
+            "timestamps": [
+                datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat() for timestamp in all_timestamps
+            ],
+            "fields": {
+                field: [None if np.isnan(value) else float(value) for value in np.concatenate(values)] if values else []
+                for field, values in columns.items()
+            },
+        }
+
+    def _segment_path(self, device_sn: str, segment: str) -> str:
+        return os.path.join(self.root, device_sn, segment)
+
+    def _write_segment(self, path: str, rows: List[Tuple[float, List[float]]]) -> None:
+        """Append rows to a segment, padding columns that fell behind the timestamps."""
+        os.makedirs(path, exist_ok=True)
+        timestamp_path = os.path.join(path, TIMESTAMP_COLUMN + COLUMN_SUFFIX)
+        existing_rows = os.path.getsize(timestamp_path) // COLUMN_DTYPE.itemsize if os.path.exists(timestamp_path) else 0
+
+        values = np.array([row[1] for row in rows], dtype=COLUMN_DTYPE).reshape(len(rows), len(ARCHIVE_FIELDS))
+        for index, field in enumerate(ARCHIVE_FIELDS):
+            column_path = os.path.join(path, field + COLUMN_SUFFIX)
+            column_rows = os.path.getsize(column_path) // COLUMN_DTYPE.itemsize if os.path.exists(column_path) else 0
+            with open(column_path, "ab") as column_file:
+                if column_rows < existing_rows:
+                    np.full(existing_rows - column_rows, np.nan, dtype=COLUMN_DTYPE).tofile(column_file)
+                values[:, index].tofile(column_file)
+
+        # Timestamps go last, so a failed write never exposes rows without their values
+        with open(timestamp_path, "ab") as timestamp_file:
+            np.array([row[0] for row in rows], dtype=COLUMN_DTYPE).tofile(timestamp_file)
+
+    @staticmethod
+    def _map_column(segment_path: str, column: str) -> Optional[np.ndarray]:
+        """Memory-map one column of a segment."""
+        path = os.path.join(segment_path, column + COLUMN_SUFFIX)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < COLUMN_DTYPE.itemsize:
+            return None
+        return np.memmap(path, dtype=COLUMN_DTYPE, mode="r", shape=(size // COLUMN_DTYPE.itemsize,))
+
+    def _segments_in_range(self, device_sn: str, start: float, end: float) -> List[str]:
+        """Return the existing segments of a device overlapping a time range, in order."""
+        device_path = os.path.join(self.root, device_sn)
+        if not os.path.isdir(device_path):
+            return []
+        first = _segment_name(start)
+        last = _segment_name(end)
+        return [
+            os.path.join(device_path, segment)
+            for segment in sorted(os.listdir(device_path))
+            if first <= segment <= last
+        ]
+
+    def _expire(self) -> None:
+        """Delete segments older than the retention period."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self._retention_days)).strftime("%Y-%m-%d")
+        if not os.path.isdir(self.root):
+            return
+        for device_sn in os.listdir(self.root):
+            device_path = os.path.join(self.root, device_sn)
+            if not os.path.isdir(device_path):
+                continue
+            for segment in os.listdir(device_path):
+                if segment < cutoff:
+                    shutil.rmtree(os.path.join(device_path, segment), ignore_errors=True)
@@ -0,0 +1,72 @@
+"""Burst polling triggers: snapshot changes that warrant temporarily faster polling."""
+from typing import Any, Dict, List, Optional
+
+from .util import to_float
+
+# A grid input voltage falling below this fraction of the previous reading counts as a drop
+GRID_VOLTAGE_DROP_RATIO = 0.9
+
+# Battery currents within this many amperes of zero have no meaningful direction
+BATTERY_CURRENT_DEADBAND = 0.5
+
+# After the burst window the interval is multiplied by this factor on every poll
+BURST_DECAY_FACTOR = 2.0
+
+
+def _direction(current: Optional[float]) -> int:
+    """Return 1 for charging, -1 for discharging and 0 inside the deadband."""
+    if current is None or abs(current) <= BATTERY_CURRENT_DEADBAND:
+        return 0
+    return 1 if current > 0 else -1
+
+
+def detect_burst_triggers(previous: Optional[Dict[str, Any]], snapshot: Dict[str, Any], load_threshold: float) -> List[str]:
+    """Return the names of the burst conditions a new snapshot meets.
+
+    Transitions are judged against the previous snapshot of the same device, so the
+    first snapshot after startup can only trigger on a load above the threshold.
+    """
+    triggers = []
+
+    # Trigger when the load crosses the threshold, not for as long as it stays above
+    load = to_float(snapshot.get("loadPercent"))
+    old_load = to_float(previous.get("loadPercent")) if previous is not None else None
+    if load is not None and load > load_threshold and (old_load is None or old_load <= load_threshold):
+        triggers.append("load")
+
+    if previous is None:
+        return triggers
+
+    old_voltage = to_float(previous.get("acRInVolt"))
+    new_voltage = to_float(snapshot.get("acRInVolt"))
+    if old_voltage and new_voltage is not None and new_voltage < old_voltage * GRID_VOLTAGE_DROP_RATIO:
+        triggers.append("grid_voltage_drop")
+
+    old_status = previous.get("status")
+    new_status = snapshot.get("status")
+    if old_status not in (None, "") and new_status not in (None, "") and old_status != new_status:
+        triggers.append("status_change")
+
+    old_direction = _direction(to_float(previous.get("battCurr")))
+    new_direction = _direction(to_float(snapshot.get("battCurr")))
+    if old_direction and new_direction and old_direction != new_direction:
+        triggers.append("battery_direction")
+
+    return triggers
+
+
+class BurstState:
+    """Shortened polling interval of one device after a trigger.
+
+    The device polls at ``interval`` until ``until``; every poll after that multiplies
+    the interval by ``BURST_DECAY_FACTOR`` until it reaches the regular intervals.
+    """
+
+    def __init__(self, interval: float, until: float):
+        self.interval = interval
+        self.until = until
+
+    def advance(self, now: float) -> None:
+        """Decay the interval once the burst window has passed."""
+        if now >= self.until:
+            self.interval *= BURST_DECAY_FACTOR
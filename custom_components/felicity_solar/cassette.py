@@ -0,0 +1,193 @@
+"""Record and replay Felicity Solar API traffic as compact JSONL cassettes."""
+import bisect
+import copy
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .const import LOGIN_ENDPOINT, PLANT_LIST_ENDPOINT, DEVICE_SNAPSHOT_ENDPOINT
+
+_LOGGER = logging.getLogger(__name__)
+
+REDACTED = "**REDACTED**"
+
+# Keys whose values never leave the recording, wherever they appear in a payload
+REDACT_KEYS = {
+    "password",
+    "token",
+    "userName",
+    "realName",
+    "email",
+    "phone",
+    "mobile",
+    "address",
+    "latitude",
+    "longitude",
+}
+
+REPLAY_TOKEN = "replay-token"
+
+
+def redact(data: Any) -> Any:
+    """Return a copy of a payload with personal data and secrets replaced."""
+    if isinstance(data, dict):
+        return {
+            key: REDACTED if key in REDACT_KEYS and value not in (None, "") else redact(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [redact(item) for item in data]
+    return data
+
+
+class CassetteRecorder:
+    """Append redacted request/response pairs to a JSONL file.
+
+    Each line is ``{"t": <epoch seconds>, "endpoint": ..., "request": ..., "response": ...}``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, endpoint: str, request: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Write one exchange; safe to call from executor threads, so the event loop never writes files."""
+        line = json.dumps(
+            {"t": round(time.time(), 3), "endpoint": endpoint, "request": redact(request), "response": redact(response)},
+            separators=(",", ":"),
+        )
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the cassette file."""
+        with self._lock:
+            self._file.close()
+
+
+class _ReplayResponse:
+    """Minimal stand-in for ``aiohttp.ClientResponse``, used as ``async with session.post(...)``."""
+
+    def __init__(self, data: Optional[Dict[str, Any]], status: int = 200):
+        self._data = data
+        self.status = status
+
+    async def __aenter__(self) -> "_ReplayResponse":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientError(f"{self.status} not found in cassette")
+
+    async def json(self, content_type: Optional[str] = None) -> Dict[str, Any]:
+        return copy.deepcopy(self._data)
+
+
+class CassetteReplaySession:
+    """Serve recorded traffic in place of the ``aiohttp.ClientSession`` of the API client.
+
+    Snapshots advance with wall time scaled by ``speed`` and loop at the end of the
+    recording. Replay is sampled, not stepped: each request gets the record current at
+    the scaled position, so when ``speed`` times the poll interval exceeds the spacing
+    of the recording, the records in between are skipped rather than replayed. With ``multiplier`` above 1 every recorded device is cloned under
+    synthetic serials (``<sn>-R001``...) to simulate a larger fleet.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, multiplier: int = 1):
+        self._speed = speed
+        self._multiplier = max(1, multiplier)
+        self._login: Optional[Dict[str, Any]] = None
+        self._plant_list: Optional[Dict[str, Any]] = None
+        self._snapshots: Dict[str, List[Tuple[float, Dict[str, Any]]]] = {}
+        # Recorded serial -> snapshot offsets in seconds from the first one
+        self._offsets: Dict[str, List[float]] = {}
+        # Synthetic serial -> recorded serial
+        self._synthetic: Dict[str, str] = {}
+        self._load(path)
+        self._started = time.monotonic()
+
+    def _load(self, path: str) -> None:
+        """Index the cassette by endpoint and device."""
+        with open(path, encoding="utf-8") as cassette:
+            for line in cassette:
+                if not line.strip():
+                    continue
+                exchange = json.loads(line)
+                endpoint = exchange.get("endpoint")
+                response = exchange.get("response") or {}
+                if endpoint == LOGIN_ENDPOINT and response.get("code") == 200:
+                    self._login = response
+                elif endpoint == PLANT_LIST_ENDPOINT and response.get("code") == 200:
+                    self._plant_list = response
+                elif endpoint == DEVICE_SNAPSHOT_ENDPOINT and response.get("data"):
+                    device_sn = exchange.get("request", {}).get("deviceSn")
+                    if device_sn:
+                        self._snapshots.setdefault(device_sn, []).append((exchange.get("t", 0.0), response))
+
+        for device_sn, records in self._snapshots.items():
+            records.sort(key=lambda record: record[0])
+            self._offsets[device_sn] = [record[0] - records[0][0] for record in records]
+
+        if self._login is not None:
+            self._login = copy.deepcopy(self._login)
+            self._login.setdefault("data", {})["token"] = REPLAY_TOKEN
+
+        if self._plant_list is not None and self._multiplier > 1:
+            self._plant_list = self._multiply_plant_list(self._plant_list)
+
+        _LOGGER.info(f"Loaded cassette {path} with snapshots for {len(self._snapshots)} devices")
+
+    def _multiply_plant_list(self, plant_list: Dict[str, Any]) -> Dict[str, Any]:
+        """Clone every recorded device under synthetic serials."""
+        plant_list = copy.deepcopy(plant_list)
+        for plant in plant_list.get("data", {}).get("dataList", []):
+            devices = plant.get("plantDeviceList", [])
+            clones = []
+            for device in devices:
+                for index in range(1, self._multiplier):
+                    synthetic_sn = f"{device.get('deviceSn')}-R{index:03d}"
+                    self._synthetic[synthetic_sn] = device.get("deviceSn")
+                    clones.append({**device, "deviceSn": synthetic_sn})
+            plant["plantDeviceList"] = devices + clones
+        return plant_list
+
+    def _snapshot_at(self, device_sn: str) -> Optional[Dict[str, Any]]:
+        """Return the recorded snapshot at the current scaled replay position."""
+        recorded_sn = self._synthetic.get(device_sn, device_sn)
+        records = self._snapshots.get(recorded_sn)
+        if not records:
+            return None
+
+        offsets = self._offsets[recorded_sn]
+        position = (time.monotonic() - self._started) * self._speed
+        if offsets[-1] > 0:
+            position %= offsets[-1]
+        index = bisect.bisect_right(offsets, position) - 1
+        response = copy.deepcopy(records[max(index, 0)][1])
+        response["data"]["deviceSn"] = device_sn
+        return response
+
+    def post(self, url: str, json: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None, timeout: Any = None) -> _ReplayResponse:
+        """Answer a request from the cassette."""
+        endpoint = urlparse(url).path
+        if endpoint == LOGIN_ENDPOINT and self._login is not None:
+            return _ReplayResponse(self._login)
+        if endpoint == PLANT_LIST_ENDPOINT and self._plant_list is not None:
+            return _ReplayResponse(self._plant_list)
+        if endpoint == DEVICE_SNAPSHOT_ENDPOINT:
+            snapshot = self._snapshot_at((json or {}).get("deviceSn"))
+            if snapshot is not None:
+                return _ReplayResponse(snapshot)
+        return _ReplayResponse(None, status=404)
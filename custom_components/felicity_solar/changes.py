@@ -0,0 +1,19 @@
+"""Field-level differences between consecutive snapshots of a device."""
+from typing import Any, Dict, Optional
+
+STATUS_FIELD = "status"
+
+
+def diff_snapshots(previous: Optional[Dict[str, Any]], snapshot: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Return ``{field: {"old": ..., "new": ...}}`` for every field whose value changed.
+
+    Fields missing from one side are reported with None on that side. The first
+    snapshot of a device has nothing to compare with and yields no changes.
+    """
+    if previous is None:
+        return {}
+    return {
+        field: {"old": previous.get(field), "new": snapshot.get(field)}
+        for field in previous.keys() | snapshot.keys()
+        if previous.get(field) != snapshot.get(field)
+    }
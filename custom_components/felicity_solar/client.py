@@ -0,0 +1,220 @@
+"""Async Felicity Solar API client without Home Assistant dependencies.
+
+The integration and the export tool both talk to the API through this client, so
+they share one login and token refresh logic.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+
+if __package__:
+    from .const import BASE_URL, LOGIN_ENDPOINT, PLANT_LIST_ENDPOINT, DEVICE_SNAPSHOT_ENDPOINT
+else:
+    # Imported by the export tool running as a plain script
+    from const import BASE_URL, LOGIN_ENDPOINT, PLANT_LIST_ENDPOINT, DEVICE_SNAPSHOT_ENDPOINT
+
+_LOGGER = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+REQUEST_TIMEOUT = 15
+
+# HTTP statuses and response codes meaning the token was rejected or has expired
+AUTH_ERROR_CODES = (401, 403)
+
+
+class FelicitySolarApiError(Exception):
+    """Raised when the API rejects a request or cannot be reached."""
+
+
+class FelicitySolarAuthError(FelicitySolarApiError):
+    """Raised when the API rejects the credentials or the token."""
+
+
+def build_login_payload(username: str, password: str) -> Dict[str, Any]:
+    """Return the login request payload."""
+    return {
+        "userName": username,
+        "password": password,
+        "version": "1.0"
+    }
+
+
+def build_plant_list_payload() -> Dict[str, Any]:
+    """Return the plant list request payload."""
+    return {
+        "pageNum": 1,
+        "pageSize": 100,  # Get more devices
+        "plantName": "",
+        "deviceSn": "",
+        "status": "",
+        "isCollected": "",
+        "plantType": "",
+        "onGridType": "",
+        "tagName": "",
+        "realName": "",
+        "orgCode": "",
+        "authorized": "",
+        "cityId": "",
+        "countryId": "",
+        "provinceId": ""
+    }
+
+
+def build_snapshot_payload(device_sn: str, device_type: str, date: Optional[datetime] = None) -> Dict[str, Any]:
+    """Return the snapshot request payload for a device at ``date`` (now by default)."""
+    return {
+        "deviceSn": device_sn,
+        "deviceType": device_type,
+        "dateStr": (date or datetime.now()).strftime(DATE_FORMAT)
+    }
+
+
+def parse_devices_info(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return one device info dict per device of a plant list response."""
+    devices_info = []
+    if data.get("code") == 200 and data.get("data", {}).get("dataList"):
+        # Get all plants and their devices
+        for plant in data["data"]["dataList"]:
+            plant_id = plant["id"]
+            plant_name = plant.get("plantName", "Unknown")
+            device_list = plant.get("plantDeviceList", [])
+
+            for device in device_list:
+                device_sn = device.get("deviceSn")
+                battery_capacity = device.get("batteryCapacity", 0)
+                device_type = device.get("deviceType", "OC")
+
+                # Always use SN as model and identifier
+                device_model = device_sn
+
+                if device_sn:
+                    device_identifier = device_sn
+                    devices_info.append({
+                        "plantId": plant_id,
+                        "plantName": plant_name,
+                        "deviceSn": device_sn,
+                        "deviceModel": device_model,
+                        "deviceType": device_type,
+                        "batteryCapacity": battery_capacity,
+                        "deviceIdentifier": device_identifier
+                    })
+                    _LOGGER.info(f"Found device: {device_identifier} in plant '{plant_name}' (ID: {plant_id})")
+
+    return devices_info
+
+
+class FelicitySolarClient:
+    """Async client for one Felicity Solar account.
+
+    Pass an ``aiohttp.ClientSession`` to share a connection pool, otherwise the client
+    opens its own and closes it in ``close()``. ``base_url`` points the client at
+    another server, such as a local stand-in for testing. A request rejected for an
+    expired token logs in again and is retried once, so long-running clients outlive
+    the token. ``recorder``, if set, receives every exchange as
+    ``(endpoint, payload, response)``.
+    """
+
+    def __init__(self, username: str, password: str, session: Optional[aiohttp.ClientSession] = None, base_url: str = BASE_URL):
+        self._username = username
+        self._password = password
+        self._base_url = base_url.rstrip("/")
+        self._token: Optional[str] = None
+        self._login_lock = asyncio.Lock()
+        self._session = session
+        self._owns_session = session is None
+        self.recorder: Optional[Callable[[str, Dict[str, Any], Dict[str, Any]], None]] = None
+
+    @property
+    def username(self) -> str:
+        """Return the account username."""
+        return self._username
+
+    def matches(self, username: str, password: str) -> bool:
+        """Return True if this client was created for the given credentials."""
+        return self._username == username and self._password == password
+
+    async def __aenter__(self) -> "FelicitySolarClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the connection pool if the client opened it."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def login(self) -> None:
+        """Login and store the token."""
+        data = await self._post(LOGIN_ENDPOINT, build_login_payload(self._username, self._password), authenticated=False)
+        token = (data.get("data") or {}).get("token")
+        if not token:
+            raise FelicitySolarApiError("Login response missing access token")
+        self._token = token
+        _LOGGER.info("Successfully logged in to Felicity Solar API")
+
+    async def get_devices_info(self) -> List[Dict[str, Any]]:
+        """Get all plants and devices of the account."""
+        return parse_devices_info(await self._post(PLANT_LIST_ENDPOINT, build_plant_list_payload()))
+
+    async def get_device_snapshot(self, device_sn: str, device_type: str = "OC", date: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Get the snapshot of a device, now or at a past ``date``."""
+        data = await self._post(DEVICE_SNAPSHOT_ENDPOINT, build_snapshot_payload(device_sn, device_type, date))
+        return data.get("data") or None
+
+    async def _post(self, endpoint: str, payload: Dict[str, Any], authenticated: bool = True) -> Dict[str, Any]:
+        """Send one request and return the response body of a successful call."""
+        if not authenticated:
+            return await self._send(endpoint, payload, None)
+
+        token = await self._ensure_token(None)
+        try:
+            return await self._send(endpoint, payload, token)
+        except FelicitySolarAuthError:
+            _LOGGER.info(f"Token rejected by {endpoint}, logging in again")
+            return await self._send(endpoint, payload, await self._ensure_token(token))
+
+    async def _ensure_token(self, rejected: Optional[str]) -> str:
+        """Return a token, logging in when there is none or it is the rejected one."""
+        async with self._login_lock:
+            # Concurrent requests rejected with the same token share one login
+            if self._token is None or self._token == rejected:
+                self._token = None
+                await self.login()
+            return self._token
+
+    async def _send(self, endpoint: str, payload: Dict[str, Any], token: Optional[str]) -> Dict[str, Any]:
+        """Send one request with an optional token."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+
+        headers = {"Content-Type": "application/json"}
+        if token is not None:
+            headers["Authorization"] = token
+
+        try:
+            async with self._session.post(
+                self._base_url + endpoint,
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                if response.status in AUTH_ERROR_CODES:
+                    raise FelicitySolarAuthError(f"{endpoint} returned HTTP {response.status}")
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise FelicitySolarApiError(f"Request to {endpoint} failed: {e}") from e
+
+        if self.recorder is not None:
+            self.recorder(endpoint, payload, data)
+        if data.get("code") in AUTH_ERROR_CODES or (endpoint == LOGIN_ENDPOINT and data.get("code") != 200):
+            raise FelicitySolarAuthError(f"{endpoint} returned {data.get('code')}: {data.get('message', 'Unknown error')}")
+        if data.get("code") != 200:
+            raise FelicitySolarApiError(f"{endpoint} returned {data.get('code')}: {data.get('message', 'Unknown error')}")
+        return data
@@ -1,66 +1,81 @@
 """Config flow for Felicity Solar integration."""
+import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_DEVICES,
+    CONF_IGNORED_DEVICES,
+    FLOW_AUTH,
+    FLOW_AUTH_TIMEOUT,
+    ACCOUNTS,
+    POLL_GROUP_FAST,
+    POLL_GROUP_MEDIUM,
+    POLL_GROUP_SLOW,
+    CONF_FAST_INTERVAL,
+    CONF_MEDIUM_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    MIN_POLL_INTERVAL,
+    CONF_WEBHOOK_ID,
+    CONF_PUSH_DEVICES,
+    CONF_MAX_IN_FLIGHT,
+    CONF_STATISTICS_ROLLUP,
+    CONF_STALE_WINDOW,
+    CONF_ARCHIVE,
+    CONF_ARCHIVE_RETENTION_DAYS,
+    DEFAULT_ARCHIVE_RETENTION_DAYS,
+    CONF_BURST_INTERVAL,
+    CONF_BURST_DURATION,
+    CONF_BURST_LOAD_PERCENT,
+    CONF_RECORD_CASSETTE,
+    CONF_REPLAY_CASSETTE,
+    CONF_REPLAY_SPEED,
+    CONF_REPLAY_MULTIPLIER,
+    CONF_RELAY,
+    CONF_RELAY_TOKEN,
+    CONF_UPSTREAM_RELAY_URL,
+    CONF_UPSTREAM_RELAY_TOKEN,
+    RELAY_URL,
+)
+from .client import FelicitySolarAuthError, FelicitySolarClient
+from .relay import async_get_relay_state
+from .coordinator import get_burst_options, get_max_in_flight, get_poll_intervals, get_stale_window
 
 class FelicitySolarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Felicity Solar."""
 
     VERSION = 1
 
-    def _get_plant_id(self, auth):
-        """Get plant ID from API."""
-        import requests
-        from .const import BASE_URL, PLANT_LIST_ENDPOINT
-        
-        try:
-            payload = {
-                "pageNum": 1,
-                "pageSize": 10,
-                "plantName": "",
-                "deviceSn": "",
-                "status": "",
-                "isCollected": "",
-                "plantType": "",
-                "onGridType": "",
-                "tagName": "",
-                "realName": "",
-                "orgCode": "",
-                "authorized": "",
-                "cityId": "",
-                "countryId": "",
-                "provinceId": ""
-            }
-            
-            headers = auth.get_auth_headers()
-            response = requests.post(
-                BASE_URL + PLANT_LIST_ENDPOINT,
-                json=payload,
-                headers=headers,
-                timeout=15
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") == 200 and data.get("data", {}).get("dataList"):
-                plants = data["data"]["dataList"]
-                if plants:
-                    return plants[0]["id"]  # Return first plant ID
-            return None
-            
-        except Exception:
-            return None
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow handler."""
+        return FelicitySolarOptionsFlow(config_entry)
+
+    def __init__(self):
+        """Initialize the flow."""
+        self._user_input = None
+        self._client = None
+        self._devices_info = []
 
     async def async_step_user(self, user_input=None) -> FlowResult:
-        """Handle the initial step."""
+        """Let the user pick between the cloud account and an upstream relay."""
+        return self.async_show_menu(step_id="user", menu_options=["cloud", "relay"])
+
+    async def async_step_cloud(self, user_input=None) -> FlowResult:
+        """Handle the cloud account login."""
         errors = {}
-        
+
         if user_input is None:
             return self.async_show_form(
-                step_id="user",
+                step_id="cloud",
                 data_schema=vol.Schema({
                     vol.Required("username"): str,
                     vol.Required("password_hash"): str,
@@ -69,30 +84,34 @@ class FelicitySolarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 }),
             )
 
-        # Validate credentials by attempting login and get plant ID
-        plant_id = None
+        # Validate credentials by attempting login and discover the plant inventory
+        account = self.hass.data.get(DOMAIN, {}).get(ACCOUNTS, {}).get(user_input["username"])
+        if account and account.client.matches(user_input["username"], user_input["password_hash"]):
+            # Another entry already holds a session for this account
+            client = account.client
+        else:
+            client = FelicitySolarClient(
+                user_input["username"], user_input["password_hash"], session=async_get_clientsession(self.hass)
+            )
         try:
-            from .auth import FelicitySolarAuth
-            auth = FelicitySolarAuth(user_input["username"], user_input["password_hash"])
-            if await self.hass.async_add_executor_job(auth.login):
-                # Get plant ID from API
-                plant_id = await self.hass.async_add_executor_job(self._get_plant_id, auth)
-                if not plant_id:
-                    errors["base"] = "no_plants_found"
-            else:
-                errors["base"] = "invalid_auth"
+            # Logs in first
+            devices_info = await client.get_devices_info()
+            if not devices_info:
+                errors["base"] = "no_plants_found"
+        except FelicitySolarAuthError:
+            errors["base"] = "invalid_auth"
         except Exception:
             errors["base"] = "cannot_connect"
-        
+
         if not errors:
-            # Don't store plant_id - it will be auto-detected each time in sensor.py
-            return self.async_create_entry(
-                title=f"Felicity Solar ({user_input['username']})",
-                data=user_input,
-            )
-        
+            # Keep the logged in client and inventory so setup does not repeat login and discovery
+            self._user_input = user_input
+            self._client = client
+            self._devices_info = devices_info
+            return await self.async_step_devices()
+
         return self.async_show_form(
-            step_id="user",
+            step_id="cloud",
             data_schema=vol.Schema({
                 vol.Required("username", default=user_input.get("username", "")): str,
                 vol.Required("password_hash"): str,
@@ -100,4 +119,208 @@ class FelicitySolarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Optional("device_name", default=user_input.get("device_name", "")): str,
             }),
             errors=errors,
-        )
\ No newline at end of file
+        )
+
+    async def async_step_relay(self, user_input=None) -> FlowResult:
+        """Subscribe to an upstream relay without logging in to the cloud."""
+        errors = {}
+
+        if user_input is not None:
+            url = user_input[CONF_UPSTREAM_RELAY_URL].strip().rstrip("/")
+            token = user_input.get(CONF_UPSTREAM_RELAY_TOKEN, "").strip()
+            try:
+                relay_state = await async_get_relay_state(self.hass, url, token)
+                if not relay_state.get("devices"):
+                    errors["base"] = "no_plants_found"
+            except aiohttp.ClientResponseError as e:
+                errors["base"] = "invalid_auth" if e.status in (401, 403) else "cannot_connect"
+            except Exception:
+                errors["base"] = "cannot_connect"
+
+            if not errors:
+                # The relay's inventory is followed live, so there is no device selection step
+                return self.async_create_entry(
+                    title=f"Felicity Solar relay ({url})",
+                    data={},
+                    options={CONF_UPSTREAM_RELAY_URL: url, CONF_UPSTREAM_RELAY_TOKEN: token},
+                )
+
+        user_input = user_input or {}
+        return self.async_show_form(
+            step_id="relay",
+            data_schema=vol.Schema({
+                vol.Required(CONF_UPSTREAM_RELAY_URL, default=user_input.get(CONF_UPSTREAM_RELAY_URL, "")): str,
+                vol.Optional(CONF_UPSTREAM_RELAY_TOKEN, default=user_input.get(CONF_UPSTREAM_RELAY_TOKEN, "")): str,
+            }),
+            errors=errors,
+        )
+
+    async def async_step_devices(self, user_input=None) -> FlowResult:
+        """Let the user pick which discovered devices to poll."""
+        errors = {}
+        device_options = {
+            device["deviceSn"]: f"{device.get('plantName', 'Unknown')} - {device['deviceSn']}"
+            for device in self._devices_info
+        }
+
+        if user_input is not None:
+            selected = user_input.get(CONF_DEVICES, [])
+            if selected:
+                username = self._user_input["username"]
+                accounts = self.hass.data.get(DOMAIN, {}).get(ACCOUNTS, {})
+                if username not in accounts or accounts[username].client is not self._client:
+                    flow_auth = self.hass.data.setdefault(DOMAIN, {}).setdefault(FLOW_AUTH, {})
+                    flow_auth[username] = client = self._client
+
+                    @callback
+                    def _async_expire_flow_auth(_now) -> None:
+                        # Entries that are never set up, such as disabled ones, must not keep it
+                        if flow_auth.get(username) is client:
+                            flow_auth.pop(username)
+
+                    async_call_later(self.hass, FLOW_AUTH_TIMEOUT, _async_expire_flow_auth)
+                return self.async_create_entry(
+                    title=f"Felicity Solar ({username})",
+                    data={
+                        **self._user_input,
+                        CONF_DEVICES: [
+                            device for device in self._devices_info
+                            if device["deviceSn"] in selected
+                        ],
+                        CONF_IGNORED_DEVICES: [
+                            device_sn for device_sn in device_options
+                            if device_sn not in selected
+                        ],
+                    },
+                )
+            errors["base"] = "no_devices_selected"
+
+        return self.async_show_form(
+            step_id="devices",
+            data_schema=vol.Schema({
+                vol.Required(CONF_DEVICES, default=list(device_options)): cv.multi_select(device_options),
+            }),
+            errors=errors,
+        )
+
+
+class FelicitySolarOptionsFlow(config_entries.OptionsFlow):
+    """Handle Felicity Solar options."""
+
+    def __init__(self, config_entry):
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Let the user pick the group of options to change."""
+        return self.async_show_menu(step_id="init", menu_options=["polling", "push", "storage", "cassette"])
+
+    def _async_save(self, user_input) -> FlowResult:
+        """Store the options of one group, keeping the others."""
+        return self.async_create_entry(title="", data={**self._entry.options, **user_input})
+
+    async def async_step_polling(self, user_input=None) -> FlowResult:
+        """Configure polling intervals, concurrency, cached data and burst polling."""
+        if user_input is not None:
+            return self._async_save(user_input)
+
+        intervals = get_poll_intervals(self._entry)
+        burst_options = get_burst_options(self._entry)
+        interval = vol.All(vol.Coerce(int), vol.Range(min=MIN_POLL_INTERVAL))
+        return self.async_show_form(
+            step_id="polling",
+            data_schema=vol.Schema({
+                vol.Required(CONF_FAST_INTERVAL, default=intervals[POLL_GROUP_FAST]): interval,
+                vol.Required(CONF_MEDIUM_INTERVAL, default=intervals[POLL_GROUP_MEDIUM]): interval,
+                vol.Required(CONF_SLOW_INTERVAL, default=intervals[POLL_GROUP_SLOW]): interval,
+                vol.Required(CONF_MAX_IN_FLIGHT, default=get_max_in_flight(self._entry)): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=32)
+                ),
+                vol.Required(CONF_STALE_WINDOW, default=get_stale_window(self._entry)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+                vol.Required(CONF_BURST_INTERVAL, default=burst_options[CONF_BURST_INTERVAL]): interval,
+                vol.Required(CONF_BURST_DURATION, default=burst_options[CONF_BURST_DURATION]): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=3600)
+                ),
+                vol.Required(CONF_BURST_LOAD_PERCENT, default=burst_options[CONF_BURST_LOAD_PERCENT]): vol.All(
+                    vol.Coerce(float), vol.Range(min=0, max=200)
+                ),
+            }),
+        )
+
+    async def async_step_push(self, user_input=None) -> FlowResult:
+        """Configure webhook-fed devices and the local relay."""
+        errors = {}
+        if user_input is not None:
+            if "username" in self._entry.data or user_input.get(CONF_UPSTREAM_RELAY_URL):
+                return self._async_save(user_input)
+            # Entries set up from a relay have no cloud login to fall back to
+            errors["base"] = "relay_url_required"
+
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        devices = coordinator.devices.values() if coordinator else self._entry.data.get(CONF_DEVICES, [])
+        device_options = {
+            device["deviceSn"]: f"{device.get('plantName', 'Unknown')} - {device['deviceSn']}"
+            for device in devices
+        }
+        push_devices = [
+            device_sn for device_sn in self._entry.options.get(CONF_PUSH_DEVICES, [])
+            if device_sn in device_options
+        ]
+
+        webhook_id = self._entry.data.get(CONF_WEBHOOK_ID)
+        webhook_path = webhook.async_generate_path(webhook_id) if webhook_id else "-"
+        relay_path = RELAY_URL.format(entry_id=self._entry.entry_id)
+        relay_token = self._entry.data.get(CONF_RELAY_TOKEN, "-")
+
+        return self.async_show_form(
+            step_id="push",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_PUSH_DEVICES, default=push_devices): cv.multi_select(device_options),
+                vol.Optional(CONF_RELAY, default=self._entry.options.get(CONF_RELAY, False)): bool,
+                vol.Optional(CONF_UPSTREAM_RELAY_URL, default=self._entry.options.get(CONF_UPSTREAM_RELAY_URL, "")): str,
+                vol.Optional(CONF_UPSTREAM_RELAY_TOKEN, default=self._entry.options.get(CONF_UPSTREAM_RELAY_TOKEN, "")): str,
+            }),
+            description_placeholders={
+                "webhook_path": webhook_path,
+                "relay_path": relay_path,
+                "relay_token": relay_token,
+            },
+            errors=errors,
+        )
+
+    async def async_step_storage(self, user_input=None) -> FlowResult:
+        """Configure hourly statistics and the snapshot archive."""
+        if user_input is not None:
+            return self._async_save(user_input)
+
+        return self.async_show_form(
+            step_id="storage",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_STATISTICS_ROLLUP, default=self._entry.options.get(CONF_STATISTICS_ROLLUP, False)): bool,
+                vol.Optional(CONF_ARCHIVE, default=self._entry.options.get(CONF_ARCHIVE, False)): bool,
+                vol.Optional(CONF_ARCHIVE_RETENTION_DAYS, default=self._entry.options.get(CONF_ARCHIVE_RETENTION_DAYS, DEFAULT_ARCHIVE_RETENTION_DAYS)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+            }),
+        )
+
+    async def async_step_cassette(self, user_input=None) -> FlowResult:
+        """Configure recording and replaying of API traffic."""
+        if user_input is not None:
+            return self._async_save(user_input)
+
+        return self.async_show_form(
+            step_id="cassette",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_RECORD_CASSETTE, default=self._entry.options.get(CONF_RECORD_CASSETTE, False)): bool,
+                vol.Optional(CONF_REPLAY_CASSETTE, default=self._entry.options.get(CONF_REPLAY_CASSETTE, "")): str,
+                vol.Optional(CONF_REPLAY_SPEED, default=self._entry.options.get(CONF_REPLAY_SPEED, 1.0)): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.1)
+                ),
+                vol.Optional(CONF_REPLAY_MULTIPLIER, default=self._entry.options.get(CONF_REPLAY_MULTIPLIER, 1)): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=1000)
+                ),
+            }),
+        )
@@ -3,3 +3,120 @@ BASE_URL = "https://shine-api.felicitysolar.com"
 LOGIN_ENDPOINT = "/userlogin"
 PLANT_LIST_ENDPOINT = "/plant/list_plant"
 DEVICE_SNAPSHOT_ENDPOINT = "/device/get_device_snapshot"
+
+CONF_DEVICES = "devices"
+CONF_IGNORED_DEVICES = "ignored_devices"
+
+# Authenticated clients handed over from the config flow to entry setup, keyed by username
+FLOW_AUTH = "flow_auth"
+# Seconds a handed over client waits for the setup of its entry before it is dropped
+FLOW_AUTH_TIMEOUT = 60
+# Shared per-account clients, keyed by username
+ACCOUNTS = "accounts"
+# Open relay websocket connections, keyed by entry id
+RELAY_CONNECTIONS = "relay_connections"
+
+# Polling groups: fast (power/current), medium (voltage/SoC/temperatures), slow (energy totals, status, signal)
+POLL_GROUP_FAST = "fast"
+POLL_GROUP_MEDIUM = "medium"
+POLL_GROUP_SLOW = "slow"
+POLL_GROUPS = (POLL_GROUP_FAST, POLL_GROUP_MEDIUM, POLL_GROUP_SLOW)
+# Listener key for entities derived from every snapshot, whichever groups were due
+POLL_GROUP_ANY = "any"
+
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_MEDIUM_INTERVAL = "medium_interval"
+CONF_SLOW_INTERVAL = "slow_interval"
+
+DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_MEDIUM_INTERVAL = 60
+DEFAULT_SLOW_INTERVAL = 300
+MIN_POLL_INTERVAL = 5
+
+# Devices fed through the entry's webhook instead of being polled
+CONF_WEBHOOK_ID = "webhook_id"
+CONF_PUSH_DEVICES = "push_devices"
+
+# Upper bound on snapshot requests running at the same time for one entry
+CONF_MAX_IN_FLIGHT = "max_in_flight"
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Seconds cached snapshots keep being served after fetches start failing
+CONF_STALE_WINDOW = "stale_window"
+DEFAULT_STALE_WINDOW = 300
+# First retry delay after a failed fetch, doubled on every further failure
+STALE_RETRY_DELAY = 10
+# Seconds between checks for pushed devices whose snapshots stopped arriving
+PUSH_CHECK_INTERVAL = 30
+
+# Burst polling after grid, status, battery direction or load triggers; a zero window disables it
+CONF_BURST_INTERVAL = "burst_interval"
+CONF_BURST_DURATION = "burst_duration"
+CONF_BURST_LOAD_PERCENT = "burst_load_percent"
+DEFAULT_BURST_INTERVAL = 5
+DEFAULT_BURST_DURATION = 0
+DEFAULT_BURST_LOAD_PERCENT = 90
+
+# Cassette recording and offline replay of API traffic; changing these reloads the entry
+CONF_RECORD_CASSETTE = "record_cassette"
+CONF_REPLAY_CASSETTE = "replay_cassette"
+CONF_REPLAY_SPEED = "replay_speed"
+CONF_REPLAY_MULTIPLIER = "replay_multiplier"
+
+# Hourly external statistics replacing the state history of high-frequency fields
+CONF_STATISTICS_ROLLUP = "statistics_rollup"
+
+# Optional columnar archive of raw snapshots; changing these reloads the entry
+CONF_ARCHIVE = "archive"
+CONF_ARCHIVE_RETENTION_DAYS = "archive_retention_days"
+DEFAULT_ARCHIVE_RETENTION_DAYS = 0
+ARCHIVE_DIRECTORY = "felicity_solar_archive"
+# Seconds between writes of buffered snapshots to the archive
+ARCHIVE_FLUSH_INTERVAL = 60
+
+# Relay serving this entry's snapshots to other Home Assistant instances, and the upstream
+# relay an entry subscribes to instead of polling the cloud; changing these reloads the entry
+CONF_RELAY = "relay"
+CONF_RELAY_TOKEN = "relay_token"
+CONF_UPSTREAM_RELAY_URL = "upstream_relay_url"
+CONF_UPSTREAM_RELAY_TOKEN = "upstream_relay_token"
+RELAY_URL = "/api/felicity_solar/relay/{entry_id}"
+# First reconnect delay to an upstream relay, doubled up to the maximum on every failure
+RELAY_RETRY_DELAY = 5
+RELAY_MAX_RETRY_DELAY = 300
+# Messages buffered for one relay subscriber before it is disconnected as too slow
+RELAY_QUEUE_SIZE = 1000
+
+# Options wired in at setup with their defaults; changing any of them reloads the entry,
+# while saving a default for an option that was never set does not
+RELOAD_OPTIONS = {
+    CONF_RECORD_CASSETTE: False,
+    CONF_REPLAY_CASSETTE: "",
+    CONF_REPLAY_SPEED: 1.0,
+    CONF_REPLAY_MULTIPLIER: 1,
+    CONF_RELAY: False,
+    CONF_UPSTREAM_RELAY_URL: "",
+    CONF_UPSTREAM_RELAY_TOKEN: "",
+    CONF_STATISTICS_ROLLUP: False,
+    CONF_ARCHIVE: False,
+    CONF_ARCHIVE_RETENTION_DAYS: DEFAULT_ARCHIVE_RETENTION_DAYS,
+}
+
+# Seconds between background rediscoveries of the account's devices
+DISCOVERY_INTERVAL = 3600
+
+# Events fired with the changed fields of every new snapshot and on device status transitions
+EVENT_SNAPSHOT_CHANGED = f"{DOMAIN}_snapshot_changed"
+EVENT_STATUS_CHANGED = f"{DOMAIN}_status_changed"
+
+# Services
+SERVICE_REFRESH = "refresh"
+SERVICE_QUERY_ARCHIVE = "query_archive"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FIELDS = "fields"
+
+# Websocket command filters
+ATTR_DEVICE_SN = "device_sn"
+ATTR_PLANT_ID = "plant_id"
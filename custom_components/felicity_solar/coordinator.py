@@ -0,0 +1,768 @@
+"""Snapshot polling scheduler for Felicity Solar devices."""
+import asyncio
+import logging
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.components.recorder.models import StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_call_later, async_track_time_change, async_track_time_interval
+from homeassistant.util import dt as dt_util, slugify
+
+from .account import FelicitySolarAccount
+from .aggregate import compute_plant_aggregates
+from .archive import SnapshotArchive
+from .burst import BurstState, detect_burst_triggers
+from .changes import STATUS_FIELD, diff_snapshots
+from .estimator import BatteryRuntimeEstimator
+from .rolling import DeviceRollingStatistics
+from .rollup import ROLLUP_FIELDS, HourlyRollup
+from .string_health import FleetStringHealth
+from .util import to_float
+from .const import (
+    DOMAIN,
+    ARCHIVE_FLUSH_INTERVAL,
+    EVENT_SNAPSHOT_CHANGED,
+    EVENT_STATUS_CHANGED,
+    POLL_GROUPS,
+    POLL_GROUP_FAST,
+    POLL_GROUP_MEDIUM,
+    POLL_GROUP_SLOW,
+    POLL_GROUP_ANY,
+    CONF_FAST_INTERVAL,
+    CONF_MEDIUM_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    CONF_PUSH_DEVICES,
+    CONF_MAX_IN_FLIGHT,
+    CONF_STATISTICS_ROLLUP,
+    CONF_STALE_WINDOW,
+    DEFAULT_STALE_WINDOW,
+    STALE_RETRY_DELAY,
+    PUSH_CHECK_INTERVAL,
+    CONF_BURST_INTERVAL,
+    CONF_BURST_DURATION,
+    CONF_BURST_LOAD_PERCENT,
+    DEFAULT_BURST_INTERVAL,
+    DEFAULT_BURST_DURATION,
+    DEFAULT_BURST_LOAD_PERCENT,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MEDIUM_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    MIN_POLL_INTERVAL,
+    RELOAD_OPTIONS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# A poll starts once a group is due within this many seconds; every other group falling
+# due before the device's next poll shares its snapshot request
+MERGE_TOLERANCE = 1.0
+
+# On-demand refreshes skip devices fetched more recently than this many seconds
+MIN_REFRESH_INTERVAL = MIN_POLL_INTERVAL
+
+
+def get_poll_intervals(entry: ConfigEntry) -> Dict[str, int]:
+    """Return the polling interval in seconds for each sensor group of an entry."""
+    scan_interval = entry.data.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+    return {
+        POLL_GROUP_FAST: entry.options.get(CONF_FAST_INTERVAL, scan_interval),
+        POLL_GROUP_MEDIUM: entry.options.get(CONF_MEDIUM_INTERVAL, max(scan_interval, DEFAULT_MEDIUM_INTERVAL)),
+        POLL_GROUP_SLOW: entry.options.get(CONF_SLOW_INTERVAL, max(scan_interval, DEFAULT_SLOW_INTERVAL)),
+    }
+
+
+def get_push_devices(entry: ConfigEntry) -> Set[str]:
+    """Return the serials of devices fed through the webhook instead of polling."""
+    return set(entry.options.get(CONF_PUSH_DEVICES, []))
+
+
+def get_max_in_flight(entry: ConfigEntry) -> int:
+    """Return the maximum number of concurrent snapshot requests of an entry."""
+    return entry.options.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT)
+
+
+def get_stale_window(entry: ConfigEntry) -> int:
+    """Return for how many seconds cached snapshots are served while fetches fail."""
+    return entry.options.get(CONF_STALE_WINDOW, DEFAULT_STALE_WINDOW)
+
+
+def get_statistics_rollup(entry: ConfigEntry) -> bool:
+    """Return whether high-frequency fields are written as hourly external statistics."""
+    return entry.options.get(CONF_STATISTICS_ROLLUP, False)
+
+
+def get_burst_options(entry: ConfigEntry) -> Dict[str, float]:
+    """Return the burst polling interval, window and load threshold of an entry."""
+    return {
+        CONF_BURST_INTERVAL: entry.options.get(CONF_BURST_INTERVAL, DEFAULT_BURST_INTERVAL),
+        CONF_BURST_DURATION: entry.options.get(CONF_BURST_DURATION, DEFAULT_BURST_DURATION),
+        CONF_BURST_LOAD_PERCENT: entry.options.get(CONF_BURST_LOAD_PERCENT, DEFAULT_BURST_LOAD_PERCENT),
+    }
+
+
+def get_reload_options(entry: ConfigEntry) -> Dict[str, Any]:
+    """Return the options of an entry that need a reload to change, with defaults filled in."""
+    return {key: entry.options.get(key, default) for key, default in RELOAD_OPTIONS.items()}
+
+
+def rollup_statistic_id(device_sn: str, field: str) -> str:
+    """Return the external statistic id of a rolled up device field."""
+    return f"{DOMAIN}:{slugify(f'{device_sn}_{field}')}"
+
+
+def plant_identifier(entry_id: str, plant_id: Any) -> str:
+    """Return the device registry identifier of a plant device, scoped to its entry."""
+    return f"{entry_id}_plant_{plant_id}"
+
+
+def get_coordinators(hass: HomeAssistant, entry_id: Optional[str] = None) -> Dict[str, "FelicitySolarCoordinator"]:
+    """Return the loaded coordinators by entry id, optionally only the one of an entry."""
+    return {
+        key: value
+        for key, value in hass.data.get(DOMAIN, {}).items()
+        if isinstance(value, FelicitySolarCoordinator) and (entry_id is None or key == entry_id)
+    }
+
+
+class FelicitySolarCoordinator:
+    """Fetch device snapshots and fan them out to the entities of each polling group.
+
+    Every device keeps a next-due time per group. When the earliest one is reached, all
+    groups falling due on that device before its next poll are merged into a single
+    snapshot request and only the entities of those groups are notified. Devices in push mode are never polled; their
+    snapshots arrive through the webhook or an upstream relay and are delivered to every
+    group at once.
+
+    Each device starts at a stable phase offset hashed from its serial, so fetches and
+    state writes of a large fleet are spread across the interval instead of bursting on
+    the same boundary, and at most ``max_in_flight`` requests run at the same time.
+
+    Plant aggregates are recomputed at most once per fast interval (a fleet sweep) and
+    only when new snapshots arrived since the previous computation.
+    """
+
+    def __init__(self, hass: HomeAssistant, account: Optional[FelicitySolarAccount], devices_info: List[Dict[str, Any]], intervals: Dict[str, int], push_devices: Optional[Set[str]] = None, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, statistics_rollup: bool = False, burst_options: Optional[Dict[str, float]] = None, archive: Optional[SnapshotArchive] = None, stale_window: int = DEFAULT_STALE_WINDOW):
+        self.hass = hass
+        self.account = account
+        self.devices: Dict[str, Dict[str, Any]] = {device["deviceSn"]: device for device in devices_info}
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        self.plant_aggregates: Dict[Any, Dict[str, Any]] = {}
+        self.statistics: Dict[str, DeviceRollingStatistics] = {
+            device_sn: DeviceRollingStatistics() for device_sn in self.devices
+        }
+        self.battery_estimators: Dict[str, BatteryRuntimeEstimator] = {
+            device_sn: BatteryRuntimeEstimator() for device_sn in self.devices
+        }
+        self.string_health = FleetStringHealth()
+        # On-disk archive receiving every snapshot, if enabled
+        self.archive = archive
+        # Hourly rollups replacing the recorder history of high-frequency fields, if enabled
+        self.rollup: Optional[HourlyRollup] = HourlyRollup() if statistics_rollup else None
+        self._intervals = dict(intervals)
+        self._next_due: Dict[str, Dict[str, float]] = {
+            device_sn: {group: 0.0 for group in POLL_GROUPS} for device_sn in self.devices
+        }
+        self._listeners: Dict[str, Dict[str, List[Callable[[Optional[Dict[str, Any]]], None]]]] = {}
+        self._plant_listeners: List[Callable[[], None]] = []
+        self._device_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._unsub_aggregate: Optional[CALLBACK_TYPE] = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._last_fetch: Dict[str, float] = {}
+        self._push_devices: Set[str] = set(push_devices or ())
+        # Set when every device is fed by an upstream relay instead of polling
+        self.push_all = False
+        self._stale_window = stale_window
+        # Monotonic and wall-clock time of the last good snapshot and consecutive failed fetches per device
+        self._last_success: Dict[str, float] = {}
+        self._last_updated: Dict[str, datetime] = {}
+        # Device serial -> device registry id, for event payloads
+        self._device_ids: Dict[str, Optional[str]] = {}
+        self._failures: Dict[str, int] = {}
+        self._burst_options: Dict[str, float] = dict(burst_options or {})
+        self._bursts: Dict[str, BurstState] = {}
+        self._request_slots = asyncio.Semaphore(max_in_flight)
+        self._unsub_timer: Optional[CALLBACK_TYPE] = None
+        self._unsub_rollup: Optional[CALLBACK_TYPE] = None
+        self._unsub_archive: Optional[CALLBACK_TYPE] = None
+        self._unsub_push_check: Optional[CALLBACK_TYPE] = None
+        self._running = False
+        # Options the entry was set up with, to detect changes needing a reload
+        self.reload_options: Dict[str, Any] = {}
+
+    @property
+    def intervals(self) -> Dict[str, int]:
+        """Return the current polling interval per group."""
+        return dict(self._intervals)
+
+    @callback
+    def async_set_intervals(self, intervals: Dict[str, int]) -> None:
+        """Apply new group intervals without restarting the schedule."""
+        for due in self._next_due.values():
+            for group, next_due in due.items():
+                if group in intervals and next_due:
+                    # Keep the time of the last fetch and only move the next one
+                    due[group] = next_due - self._intervals[group] + intervals[group]
+        self._intervals.update(intervals)
+        _LOGGER.info(f"Updated polling intervals: {self._intervals}")
+        self._schedule_next()
+
+    @callback
+    def async_set_max_in_flight(self, max_in_flight: int) -> None:
+        """Change the concurrent request cap; requests already waiting keep the old one."""
+        self._request_slots = asyncio.Semaphore(max_in_flight)
+
+    @callback
+    def async_set_stale_window(self, stale_window: int) -> None:
+        """Change how long cached snapshots are served while fetches fail."""
+        self._stale_window = stale_window
+
+    def is_stale(self, device_sn: str) -> bool:
+        """Return True while a device is served from its last good snapshot."""
+        return self._failures.get(device_sn, 0) > 0 and device_sn in self.snapshots
+
+    def get_data_age(self, device_sn: str) -> Optional[int]:
+        """Return the age in seconds of the data served for a device, 0 if current."""
+        if device_sn not in self.snapshots:
+            return None
+        if not self.is_stale(device_sn) or device_sn not in self._last_success:
+            return 0
+        return round(time.monotonic() - self._last_success[device_sn])
+
+    def get_last_updated(self, device_sn: str) -> Optional[datetime]:
+        """Return when the data served for a device was received, None once it expired."""
+        if device_sn not in self.snapshots:
+            return None
+        return self._last_updated.get(device_sn)
+
+    @callback
+    def async_set_burst_options(self, burst_options: Dict[str, float]) -> None:
+        """Apply new burst settings; running bursts end when bursts are disabled."""
+        self._burst_options = dict(burst_options)
+        if not self._burst_options.get(CONF_BURST_DURATION):
+            self._bursts.clear()
+
+    @property
+    def push_devices(self) -> FrozenSet[str]:
+        """Return the serials selected to be fed by webhook push."""
+        return frozenset(self._push_devices)
+
+    @callback
+    def async_set_push_devices(self, push_devices: Set[str]) -> None:
+        """Switch devices between webhook push and polling."""
+        for device_sn in set(push_devices) - self._push_devices:
+            _LOGGER.info(f"Polling disabled for device {device_sn}, expecting webhook pushes")
+        for device_sn in (self._push_devices - set(push_devices)) & set(self.devices):
+            # Resume polling returning devices at their phase instead of their old schedule
+            self._next_due[device_sn] = {group: 0.0 for group in POLL_GROUPS}
+        self._push_devices = set(push_devices)
+        self._async_assign_phases()
+        self._schedule_next()
+
+    @callback
+    def async_push_snapshot(self, device_sn: str, snapshot: Dict[str, Any], updated: Optional[datetime] = None) -> bool:
+        """Deliver an externally collected snapshot to every group of a device.
+
+        ``updated`` is when the source received the snapshot; snapshots not newer than
+        the one already held, such as the state resent by a reconnecting relay, are skipped.
+        """
+        if device_sn not in self.devices:
+            return False
+        if updated is not None and device_sn in self._last_updated and updated <= self._last_updated[device_sn]:
+            if device_sn in self.snapshots and self._failures.pop(device_sn, 0):
+                # The source is back and the snapshot held is still its latest one
+                self._last_success[device_sn] = time.monotonic()
+                self._async_notify(device_sn, list(POLL_GROUPS), self.snapshots[device_sn])
+                self._async_schedule_aggregation()
+            return True
+        if self._failures.pop(device_sn, 0):
+            _LOGGER.info(f"Snapshots of device {device_sn} are available again")
+        self._async_dispatch(device_sn, list(POLL_GROUPS), snapshot, updated)
+        return True
+
+    @callback
+    def async_push_unavailable(self, device_sn: str) -> None:
+        """Mark a pushed device unavailable right away, after its source expired its data."""
+        if self.snapshots.pop(device_sn, None) is not None:
+            self._failures.pop(device_sn, None)
+            self._async_schedule_aggregation()
+            self._async_dispatch(device_sn, list(POLL_GROUPS), None)
+
+    @callback
+    def async_push_lost(self) -> None:
+        """Age every pushed device after the connection feeding them dropped."""
+        for device_sn in list(self.snapshots):
+            if self._is_pushed(device_sn):
+                self._async_age_push(device_sn)
+
+    @callback
+    def _async_age_push(self, device_sn: str) -> None:
+        """Serve a pushed device from its last snapshot until the staleness window expires."""
+        if device_sn in self.snapshots and not self._async_serve_stale(device_sn):
+            self._async_dispatch(device_sn, list(POLL_GROUPS), None)
+
+    @callback
+    def async_add_listener(self, device_sn: str, group: str, update_callback: Callable[[Optional[Dict[str, Any]]], None]) -> CALLBACK_TYPE:
+        """Register a callback for fresh snapshots of a device group."""
+        listeners = self._listeners.setdefault(device_sn, {}).setdefault(group, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_add_plant_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Register a callback for recomputed plant aggregates."""
+        self._plant_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._plant_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_add_devices_listener(self, update_callback: Callable[[List[Dict[str, Any]]], None]) -> CALLBACK_TYPE:
+        """Register a callback for devices added by rediscovery."""
+        self._device_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._device_listeners.remove(update_callback)
+
+        return remove_listener
+
+    async def async_discover_devices(self, ignored_devices: Set[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Diff the account inventory against the polled devices and apply the changes.
+
+        Only the plant list is requested. New devices start polling at their phase and
+        removed devices stop polling and go unavailable; every other device keeps its
+        schedule. Returns the added device infos and the removed serials.
+        """
+        devices_info = await self.account.async_get_devices_info()
+        if not devices_info:
+            # An empty list means the request failed, not that every device is gone
+            _LOGGER.warning("Device rediscovery returned no devices, keeping the current inventory")
+            return [], []
+        return self.async_apply_inventory(devices_info, ignored_devices)
+
+    @callback
+    def async_apply_inventory(self, devices_info: List[Dict[str, Any]], ignored_devices: Set[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Add and remove devices to match an inventory, such as one announced by a relay."""
+        discovered = {
+            device["deviceSn"]: device for device in devices_info
+            if device.get("deviceSn") and device["deviceSn"] not in ignored_devices
+        }
+        added = [device for device_sn, device in discovered.items() if device_sn not in self.devices]
+        removed = [device_sn for device_sn in self.devices if device_sn not in discovered]
+
+        for device_sn in removed:
+            _LOGGER.info(f"Device {device_sn} is no longer listed on the account, stopping its polling")
+            self._async_remove_device(device_sn)
+        for device in added:
+            _LOGGER.info(f"Discovered new device {device['deviceSn']} in plant {device.get('plantName')}")
+            self._async_add_device(device)
+
+        if added:
+            for update_callback in list(self._device_listeners):
+                update_callback(added)
+        if added or removed:
+            self._async_assign_phases()
+            self._schedule_next()
+            self._async_schedule_aggregation()
+        return added, removed
+
+    async def async_request_refresh(self, device_sns: Optional[List[str]] = None) -> None:
+        """Fetch devices now, coalescing with fetches already in flight.
+
+        Devices fetched less than ``MIN_REFRESH_INTERVAL`` seconds ago are considered
+        fresh and skipped, so repeated calls never multiply cloud requests. A refreshed
+        device restarts its schedule from now.
+        """
+        now = time.monotonic()
+        tasks = []
+        for device_sn in device_sns if device_sns is not None else list(self.devices):
+            if device_sn not in self.devices or self._is_pushed(device_sn):
+                continue
+            if device_sn in self._in_flight:
+                tasks.append(self._in_flight[device_sn])
+            elif now - self._last_fetch.get(device_sn, 0.0) >= MIN_REFRESH_INTERVAL:
+                tasks.append(self._async_begin_poll(device_sn, list(POLL_GROUPS), now, reset=True))
+
+        if tasks:
+            await asyncio.gather(*(asyncio.shield(task) for task in tasks))
+
+    @callback
+    def async_start(self) -> None:
+        """Start the polling schedule."""
+        self._running = True
+        self._async_assign_phases()
+        self._schedule_next()
+        if self.rollup is not None:
+            # Shortly after every full hour, once the last samples of the hour arrived
+            self._unsub_rollup = async_track_time_change(
+                self.hass, self._async_write_rollup, minute=0, second=30
+            )
+        if self.archive is not None:
+            self._unsub_archive = async_track_time_interval(
+                self.hass, self._async_flush_archive, timedelta(seconds=ARCHIVE_FLUSH_INTERVAL)
+            )
+        self._unsub_push_check = async_track_time_interval(
+            self.hass, self._async_check_pushes, timedelta(seconds=PUSH_CHECK_INTERVAL)
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the polling schedule."""
+        self._running = False
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._unsub_aggregate:
+            self._unsub_aggregate()
+            self._unsub_aggregate = None
+        if self._unsub_rollup:
+            self._unsub_rollup()
+            self._unsub_rollup = None
+        if self._unsub_archive:
+            self._unsub_archive()
+            self._unsub_archive = None
+        if self._unsub_push_check:
+            self._unsub_push_check()
+            self._unsub_push_check = None
+
+    async def async_shutdown(self) -> None:
+        """Stop the polling schedule and write the snapshots still buffered for the archive."""
+        self.async_stop()
+        if self.archive is not None:
+            # Waits behind a periodic flush still running, so nothing writes once this returns
+            await self.hass.async_add_executor_job(self.archive.flush)
+
+    def _is_pushed(self, device_sn: str) -> bool:
+        """Return True if a device is fed by pushes instead of being polled."""
+        return self.push_all or device_sn in self._push_devices
+
+    @callback
+    def _async_check_pushes(self, _now=None) -> None:
+        """Age pushed devices that received nothing for the slowest polling interval."""
+        now = time.monotonic()
+        overdue = max(self._intervals.values())
+        for device_sn in list(self.snapshots):
+            if self._is_pushed(device_sn) and now - self._last_success.get(device_sn, now) >= overdue:
+                self._async_age_push(device_sn)
+
+    def _phase_offset(self, device_sn: str) -> float:
+        """Return the stable offset of a device within the fastest interval."""
+        fraction = zlib.crc32(device_sn.encode()) / 0x100000000
+        return fraction * min(self._intervals.values())
+
+    @callback
+    def _async_assign_phases(self) -> None:
+        """Give every device that was never polled its first due time."""
+        now = time.monotonic()
+        for device_sn, due in self._next_due.items():
+            for group, next_due in due.items():
+                if not next_due:
+                    due[group] = now + self._phase_offset(device_sn)
+
+    @callback
+    def _schedule_next(self) -> None:
+        """Arm the timer for the earliest due group of any idle device."""
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._running:
+            return
+
+        due_times = [
+            min(due.values())
+            for device_sn, due in self._next_due.items()
+            if device_sn not in self._in_flight and not self._is_pushed(device_sn)
+        ]
+        if not due_times:
+            return
+
+        delay = max(0.0, min(due_times) - time.monotonic())
+        self._unsub_timer = async_call_later(self.hass, delay, self._handle_timer)
+
+    @callback
+    def _handle_timer(self, _now) -> None:
+        """Start a fetch for every device with at least one due group."""
+        self._unsub_timer = None
+        now = time.monotonic()
+
+        for device_sn, due in self._next_due.items():
+            if device_sn in self._in_flight or self._is_pushed(device_sn):
+                continue
+            if not any(next_due <= now + MERGE_TOLERANCE for next_due in due.values()):
+                continue
+            # The snapshot is fetched anyway, so groups falling due before the device's next
+            # poll ride along instead of costing a request of their own and keep aligned to it
+            horizon = now + min(self._get_interval(device_sn, group) for group in due)
+            groups = [group for group, next_due in due.items() if next_due < horizon]
+            self._async_begin_poll(device_sn, groups, now)
+
+        self._schedule_next()
+
+    @callback
+    def _async_begin_poll(self, device_sn: str, groups: List[str], now: float, reset: bool = False) -> asyncio.Task:
+        """Start one fetch for a device and advance its due groups."""
+        burst = self._bursts.get(device_sn)
+        if burst is not None:
+            burst.advance(now)
+            if burst.interval >= min(self._intervals.values()):
+                _LOGGER.debug(f"Burst polling of device {device_sn} ended")
+                del self._bursts[device_sn]
+
+        due = self._next_due[device_sn]
+        for group in groups:
+            interval = self._get_interval(device_sn, group)
+            if reset or not due[group]:
+                due[group] = now + interval
+                continue
+            # Advance on the original grid so groups with related intervals keep coinciding
+            next_due = due[group] + interval
+            due[group] = next_due if next_due > now else now + interval
+
+        self._last_fetch[device_sn] = now
+        task = self.hass.async_create_task(self._async_poll_device(device_sn, groups))
+        self._in_flight[device_sn] = task
+        if reset:
+            self._schedule_next()
+        return task
+
+    async def _async_poll_device(self, device_sn: str, groups: List[str]) -> None:
+        """Fetch one snapshot for a device and notify the due groups."""
+        try:
+            async with self._request_slots:
+                if device_sn not in self.devices:
+                    # Removed by rediscovery while waiting for a request slot
+                    return
+                snapshot = await self._async_fetch_snapshot(device_sn)
+        finally:
+            self._in_flight.pop(device_sn, None)
+
+        if device_sn not in self.devices:
+            # Removed by rediscovery while the request was running
+            return
+
+        if snapshot is None:
+            _LOGGER.warning(f"No snapshot data available for device {device_sn}")
+            if self._async_serve_stale(device_sn):
+                self._schedule_next()
+                return
+        elif self._failures.pop(device_sn, 0):
+            _LOGGER.info(f"Snapshots of device {device_sn} are available again")
+
+        self._async_dispatch(device_sn, groups, snapshot)
+        self._schedule_next()
+
+    @callback
+    def _async_serve_stale(self, device_sn: str) -> bool:
+        """Keep serving the last good snapshot after a failed fetch and retry soon.
+
+        Returns False once the staleness window has expired, so the failure is
+        dispatched and the entities go unavailable. The expired snapshot is dropped, so
+        aggregates, string health, the relay and the websocket API stop using it.
+        """
+        now = time.monotonic()
+        last_success = self._last_success.get(device_sn)
+        if last_success is None or device_sn not in self.snapshots or now - last_success >= self._stale_window:
+            self._failures.pop(device_sn, None)
+            if self.snapshots.pop(device_sn, None) is not None:
+                self._async_schedule_aggregation()
+            return False
+
+        failures = self._failures.get(device_sn, 0) + 1
+        self._failures[device_sn] = failures
+        if failures == 1:
+            # Write the entities once so they report being stale; later retries stay silent
+            self._async_notify(device_sn, list(POLL_GROUPS), self.snapshots[device_sn])
+            self._async_schedule_aggregation()
+
+        # Retry in the background with a doubling delay, never slower than the regular schedule
+        retry_at = now + min(STALE_RETRY_DELAY * 2 ** (failures - 1), min(self._intervals.values()))
+        due = self._next_due.get(device_sn, {})
+        for group, next_due in due.items():
+            due[group] = min(next_due, retry_at)
+        return True
+
+    def _get_interval(self, device_sn: str, group: str) -> float:
+        """Return the polling interval of a device group, shortened during a burst."""
+        burst = self._bursts.get(device_sn)
+        if burst is None:
+            return self._intervals[group]
+        return min(self._intervals[group], burst.interval)
+
+    @callback
+    def _async_check_burst(self, device_sn: str, previous: Optional[Dict[str, Any]], snapshot: Dict[str, Any]) -> None:
+        """Start or extend a burst of fast polling when a snapshot meets a trigger."""
+        duration = self._burst_options.get(CONF_BURST_DURATION)
+        interval = self._burst_options.get(CONF_BURST_INTERVAL, DEFAULT_BURST_INTERVAL)
+        if not duration or self._is_pushed(device_sn) or interval >= min(self._intervals.values()):
+            return
+
+        triggers = detect_burst_triggers(
+            previous, snapshot, self._burst_options.get(CONF_BURST_LOAD_PERCENT, DEFAULT_BURST_LOAD_PERCENT)
+        )
+        if not triggers:
+            return
+
+        now = time.monotonic()
+        if device_sn not in self._bursts:
+            _LOGGER.info(f"Polling device {device_sn} every {interval} s for {duration} s after: {', '.join(triggers)}")
+        self._bursts[device_sn] = BurstState(interval, now + duration)
+
+        # Bring every group of the device forward to the burst rate
+        due = self._next_due.get(device_sn, {})
+        for group, next_due in due.items():
+            if next_due:
+                due[group] = min(next_due, now + interval)
+        self._schedule_next()
+
+    @callback
+    def _async_dispatch(self, device_sn: str, groups: List[str], snapshot: Optional[Dict[str, Any]], updated: Optional[datetime] = None) -> None:
+        """Store a snapshot received at ``updated`` (now by default) and notify the listeners of the given groups."""
+        if snapshot is not None:
+            previous = self.snapshots.get(device_sn)
+            self.snapshots[device_sn] = snapshot
+            self._last_success[device_sn] = time.monotonic()
+            self._last_updated[device_sn] = updated or dt_util.utcnow()
+            self._async_check_burst(device_sn, previous, snapshot)
+            self._async_fire_changes(device_sn, previous, snapshot)
+            now = time.monotonic()
+            self.statistics.setdefault(device_sn, DeviceRollingStatistics()).add_snapshot(now, snapshot)
+            self._async_update_estimator(device_sn, now, snapshot)
+            if self.rollup is not None:
+                self.rollup.add_snapshot(dt_util.utcnow(), device_sn, snapshot)
+            if self.archive is not None:
+                self.archive.append(device_sn, time.time(), snapshot)
+            self._async_schedule_aggregation()
+
+        self._async_notify(device_sn, groups, snapshot)
+
+    @callback
+    def _async_fire_changes(self, device_sn: str, previous: Optional[Dict[str, Any]], snapshot: Dict[str, Any]) -> None:
+        """Fire one event with the changed fields of a device, plus one for a status transition."""
+        changes = diff_snapshots(previous, snapshot)
+        if not changes:
+            return
+
+        device = self.devices.get(device_sn, {})
+        event_data = {
+            "device_sn": device_sn,
+            "device_id": self._get_device_id(device_sn),
+            "plant_id": device.get("plantId"),
+        }
+        self.hass.bus.async_fire(EVENT_SNAPSHOT_CHANGED, {**event_data, "changes": changes})
+
+        status = changes.get(STATUS_FIELD)
+        if status is not None and status["old"] is not None:
+            self.hass.bus.async_fire(EVENT_STATUS_CHANGED, {**event_data, **status})
+
+    def _get_device_id(self, device_sn: str) -> Optional[str]:
+        """Return the device registry id of a device, once its entities registered it."""
+        if self._device_ids.get(device_sn) is None:
+            device_identifier = self.devices.get(device_sn, {}).get("deviceIdentifier") or device_sn
+            device = dr.async_get(self.hass).async_get_device(identifiers={(DOMAIN, device_identifier)})
+            self._device_ids[device_sn] = device.id if device else None
+        return self._device_ids[device_sn]
+
+    @callback
+    def _async_notify(self, device_sn: str, groups: List[str], snapshot: Optional[Dict[str, Any]]) -> None:
+        """Call the listeners of the given groups of a device."""
+        for group in (*groups, POLL_GROUP_ANY):
+            for update_callback in list(self._listeners.get(device_sn, {}).get(group, [])):
+                update_callback(snapshot)
+
+    @callback
+    def _async_update_estimator(self, device_sn: str, now: float, snapshot: Dict[str, Any]) -> None:
+        """Feed battery SoC and power into the runtime estimator of a device."""
+        soc = to_float(snapshot.get("battSoc"))
+        if soc is None:
+            return
+        power = to_float(snapshot.get("bmsPower"))
+        self.battery_estimators.setdefault(device_sn, BatteryRuntimeEstimator()).add_sample(now, soc, power)
+
+    @callback
+    def _async_add_device(self, device: Dict[str, Any]) -> None:
+        """Start tracking a device; it is polled once phases are assigned."""
+        device_sn = device["deviceSn"]
+        self.devices[device_sn] = device
+        self.statistics.setdefault(device_sn, DeviceRollingStatistics())
+        self.battery_estimators.setdefault(device_sn, BatteryRuntimeEstimator())
+        self._next_due[device_sn] = {group: 0.0 for group in POLL_GROUPS}
+
+    @callback
+    def _async_remove_device(self, device_sn: str) -> None:
+        """Stop tracking a device and mark its entities unavailable."""
+        self.devices.pop(device_sn, None)
+        self.snapshots.pop(device_sn, None)
+        self._next_due.pop(device_sn, None)
+        self._last_success.pop(device_sn, None)
+        self._last_updated.pop(device_sn, None)
+        self._failures.pop(device_sn, None)
+        self._async_notify(device_sn, list(POLL_GROUPS), None)
+
+    @callback
+    def _async_write_rollup(self, _now=None) -> None:
+        """Write every closed hour to the recorder as external statistics."""
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.warning("Recorder is not loaded, hourly statistics are not written")
+            return
+
+        for (device_sn, field), statistics in self.rollup.pop_completed(dt_util.utcnow()).items():
+            name, unit = ROLLUP_FIELDS[field]
+            device_identifier = self.devices.get(device_sn, {}).get("deviceIdentifier") or device_sn
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{device_identifier} {name}",
+                source=DOMAIN,
+                statistic_id=rollup_statistic_id(device_sn, field),
+                unit_of_measurement=unit,
+            )
+            async_add_external_statistics(self.hass, metadata, statistics)
+
+    @callback
+    def _async_flush_archive(self, _now=None) -> None:
+        """Write the buffered snapshots to the archive in the executor."""
+        self.hass.async_add_executor_job(self.archive.flush)
+
+    @callback
+    def _async_schedule_aggregation(self) -> None:
+        """Recompute plant aggregates at the end of the current sweep."""
+        if self._unsub_aggregate or not self._plant_listeners:
+            return
+        self._unsub_aggregate = async_call_later(
+            self.hass, self._intervals[POLL_GROUP_FAST], self._async_update_aggregates
+        )
+
+    @callback
+    def _async_update_aggregates(self, _now=None) -> None:
+        """Compute plant aggregates and string health in one pass and notify plant sensors."""
+        self._unsub_aggregate = None
+        # Devices served from their cached snapshot only keep their energy counters in plant totals
+        stale = {device_sn for device_sn in self.snapshots if self.is_stale(device_sn)}
+        self.plant_aggregates = compute_plant_aggregates(self.devices, self.snapshots, stale)
+        current = {
+            device_sn: snapshot for device_sn, snapshot in self.snapshots.items()
+            if device_sn not in stale
+        }
+        self.string_health.update(time.monotonic(), self.devices, current)
+        for update_callback in list(self._plant_listeners):
+            update_callback()
+
+    async def _async_fetch_snapshot(self, device_sn: str) -> Optional[Dict[str, Any]]:
+        """Request a device snapshot through the shared account client."""
+        device_type = self.devices[device_sn].get("deviceType", "OC")
+        return await self.account.async_get_snapshot(device_sn, device_type)
@@ -0,0 +1,101 @@
+"""Incremental battery time-to-empty and time-to-full estimation."""
+import math
+from typing import Optional
+
+# Time constant of the exponential weighting, in seconds
+DEFAULT_TIME_CONSTANT = 900.0
+
+# Below this SoC rate (percent per hour) the battery is considered idle
+MIN_SOC_RATE_PER_HOUR = 0.5
+
+# Below this absolute battery power (W) the battery is considered idle
+IDLE_POWER = 30.0
+
+# A new estimate is published once it moves by at least this many minutes...
+MIN_PUBLISH_CHANGE_MINUTES = 2.0
+# ...or by at least this fraction of the previously published value, so short
+# estimates near empty or full still follow small absolute changes
+MIN_PUBLISH_CHANGE_RATIO = 0.05
+
+
+class BatteryRuntimeEstimator:
+    """Exponentially weighted linear regression of battery SoC over time.
+
+    Each sample updates a handful of weighted sums in O(1): the previous sums are
+    decayed by the elapsed time, shifted so the newest sample sits at t=0, and the
+    sample is added. Slope and intercept of the fit give the charge or discharge rate
+    and the smoothed SoC, from which time-to-empty and time-to-full follow.
+    """
+
+    def __init__(self, time_constant: float = DEFAULT_TIME_CONSTANT):
+        self._time_constant = time_constant
+        self._last_timestamp: Optional[float] = None
+        self._samples = 0
+        # Weighted sums of 1, t, t^2, y and t*y with t relative to the newest sample
+        self._sw = 0.0
+        self._st = 0.0
+        self._stt = 0.0
+        self._sy = 0.0
+        self._sty = 0.0
+        self.time_to_empty: Optional[float] = None
+        self.time_to_full: Optional[float] = None
+        # Incremented every time a meaningfully different estimate is published
+        self.revision = 0
+
+    def add_sample(self, timestamp: float, soc: float, power: Optional[float] = None) -> bool:
+        """Add a SoC sample and return True if the published estimates changed."""
+        if self._last_timestamp is not None:
+            elapsed = timestamp - self._last_timestamp
+            if elapsed <= 0:
+                return False
+            decay = math.exp(-elapsed / self._time_constant)
+            # Shift the time origin to the new sample, then decay the old weights
+            self._stt = decay * (self._stt - 2 * elapsed * self._st + elapsed * elapsed * self._sw)
+            self._sty = decay * (self._sty - elapsed * self._sy)
+            self._st = decay * (self._st - elapsed * self._sw)
+            self._sy = decay * self._sy
+            self._sw = decay * self._sw
+
+        self._sw += 1.0
+        self._sy += soc
+        self._last_timestamp = timestamp
+        self._samples += 1
+
+        time_to_empty, time_to_full = self._estimate(power)
+        changed = self._should_publish(self.time_to_empty, time_to_empty) or self._should_publish(self.time_to_full, time_to_full)
+        if changed:
+            self.time_to_empty = time_to_empty
+            self.time_to_full = time_to_full
+            self.revision += 1
+        return changed
+
+    def _estimate(self, power: Optional[float]):
+        """Return (time_to_empty, time_to_full) in minutes from the current fit."""
+        if self._samples < 3:
+            return None, None
+        if power is not None and abs(power) < IDLE_POWER:
+            return None, None
+
+        denominator = self._sw * self._stt - self._st * self._st
+        if denominator <= 1e-9:
+            return None, None
+
+        slope = (self._sw * self._sty - self._st * self._sy) / denominator
+        intercept = (self._sy - slope * self._st) / self._sw
+        soc = min(100.0, max(0.0, intercept))
+
+        rate_per_hour = slope * 3600
+        if abs(rate_per_hour) < MIN_SOC_RATE_PER_HOUR:
+            return None, None
+
+        if rate_per_hour < 0:
+            return round(soc / -rate_per_hour * 60, 1), None
+        return None, round((100.0 - soc) / rate_per_hour * 60, 1)
+
+    @staticmethod
+    def _should_publish(old: Optional[float], new: Optional[float]) -> bool:
+        """Return True if the estimate moved meaningfully."""
+        if old is None or new is None:
+            return old is not new
+        change = abs(new - old)
+        return change >= MIN_PUBLISH_CHANGE_MINUTES or change >= MIN_PUBLISH_CHANGE_RATIO * old
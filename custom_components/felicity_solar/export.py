@@ -0,0 +1,303 @@
+"""Stream Felicity Solar snapshots of every device on an account to CSV, JSONL or Parquet.
+
+Runs as a plain script, without Home Assistant:
+
+    python custom_components/felicity_solar/export.py -u USER -p PASSWORD_HASH --format csv -o snapshots.csv
+
+Where Home Assistant is installed, ``python -m custom_components.felicity_solar.export``
+works as well.
+
+With ``--start`` the tool walks the device history in ``--step`` minute increments
+instead of exporting the current snapshots. Requests run with bounded concurrency and
+rows are written as they arrive, so memory stays constant however long the range is.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+if __package__:
+    from .client import DATE_FORMAT, FelicitySolarApiError, FelicitySolarClient
+    from .const import BASE_URL
+else:
+    # Run as a script: the integration package, and with it Home Assistant, is not imported
+    from client import DATE_FORMAT, FelicitySolarApiError, FelicitySolarClient
+    from const import BASE_URL
+
+_LOGGER = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+# Columns identifying each exported row, ahead of the snapshot fields
+ROW_KEY_FIELDS = ("plantId", "plantName", "deviceSn", "requestedAt")
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_STEP_MINUTES = 5
+PARQUET_BATCH_SIZE = 1000
+
+
+def _scalar(value: Any) -> Any:
+    """Return a value fit for a flat column; nested data is kept as JSON text."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class JsonlWriter:
+    """Write one JSON object per line, keeping nested snapshot data."""
+
+    def __init__(self, output):
+        self._output = output
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._output.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        self._output.flush()
+
+
+class CsvWriter:
+    """Write rows as CSV; the columns come from ``fields`` or the first row."""
+
+    def __init__(self, output, fields: Optional[List[str]] = None):
+        self._output = output
+        self._fields = fields
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._writer is None:
+            fields = self._fields or list(row)
+            self._writer = csv.DictWriter(self._output, fieldnames=fields, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow({key: _scalar(value) for key, value in row.items()})
+
+    def close(self) -> None:
+        self._output.flush()
+
+
+class ParquetWriter:
+    """Write rows to Parquet in row groups of ``batch_size`` rows.
+
+    Column types are inferred from the first batch: columns whose values are all
+    numeric become float64, every other column is a string.
+    """
+
+    def __init__(self, path: str, fields: Optional[List[str]] = None, batch_size: int = PARQUET_BATCH_SIZE):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise SystemExit("Parquet export requires pyarrow (pip install pyarrow)") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._path = path
+        self._fields = fields
+        self._batch_size = batch_size
+        self._rows: List[Dict[str, Any]] = []
+        self._schema = None
+        self._writer = None
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self._batch_size:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        if self._schema is None:
+            self._schema = self._infer_schema(self._rows)
+            self._writer = self._pq.ParquetWriter(self._path, self._schema)
+
+        columns = {
+            field.name: [self._coerce(row.get(field.name), field.type) for row in self._rows]
+            for field in self._schema
+        }
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+        self._rows = []
+
+    def _infer_schema(self, rows: List[Dict[str, Any]]):
+        fields = self._fields or list(dict.fromkeys(key for row in rows for key in row))
+        schema = []
+        for name in fields:
+            values = [row.get(name) for row in rows if row.get(name) not in (None, "")]
+            numeric = bool(values) and all(self._to_float(value) is not None for value in values)
+            schema.append((name, self._pa.float64() if numeric else self._pa.string()))
+        return self._pa.schema(schema)
+
+    def _coerce(self, value: Any, column_type) -> Any:
+        if value is None or value == "":
+            return None
+        if column_type == self._pa.float64():
+            return self._to_float(value)
+        return str(_scalar(value))
+
+    @staticmethod
+    def _to_float(value: Any) -> Optional[float]:
+        if isinstance(value, bool):
+            return None
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+
+
+def _iter_requests(devices_info: List[Dict[str, Any]], start: Optional[datetime], end: datetime, step: timedelta) -> Iterator[Tuple[Dict[str, Any], Optional[datetime]]]:
+    """Yield (device, date) pairs lazily; ``date`` is None for a current snapshot."""
+    for device in devices_info:
+        if start is None:
+            yield device, None
+            continue
+        date = start
+        while date <= end:
+            yield device, date
+            date += step
+
+
+async def export_snapshots(client: FelicitySolarClient, writer, devices: Optional[List[str]] = None, start: Optional[datetime] = None, end: Optional[datetime] = None, step: timedelta = timedelta(minutes=DEFAULT_STEP_MINUTES), concurrency: int = DEFAULT_CONCURRENCY) -> Tuple[int, int]:
+    """Stream snapshots of the account's devices into ``writer``.
+
+    A fixed pool of ``concurrency`` workers pulls requests from a bounded queue and
+    hands rows to the writer through another bounded queue, so neither requests nor
+    rows pile up in memory. Returns the number of rows written and of failed requests.
+    """
+    devices_info = await client.get_devices_info()
+    if devices:
+        devices_info = [device for device in devices_info if device["deviceSn"] in devices]
+    end = end or datetime.now()
+
+    requests_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    rows_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    failed = 0
+
+    async def produce() -> None:
+        for request in _iter_requests(devices_info, start, end, step):
+            await requests_queue.put(request)
+        for _ in range(concurrency):
+            await requests_queue.put(None)
+
+    async def fetch() -> None:
+        nonlocal failed
+        while (request := await requests_queue.get()) is not None:
+            device, date = request
+            try:
+                snapshot = await client.get_device_snapshot(device["deviceSn"], device.get("deviceType", "OC"), date)
+            except FelicitySolarApiError as e:
+                _LOGGER.warning(f"Snapshot of {device['deviceSn']} at {date or 'now'} failed: {e}")
+                failed += 1
+                continue
+            if snapshot is None:
+                continue
+            await rows_queue.put({
+                "plantId": device.get("plantId"),
+                "plantName": device.get("plantName"),
+                "deviceSn": device["deviceSn"],
+                "requestedAt": (date or datetime.now()).strftime(DATE_FORMAT),
+                **{key: value for key, value in snapshot.items() if key not in ROW_KEY_FIELDS},
+            })
+
+    async def fetch_all() -> None:
+        try:
+            await asyncio.gather(*(fetch() for _ in range(concurrency)))
+        finally:
+            # Always end the writer loop, also when a worker fails unexpectedly
+            await rows_queue.put(None)
+
+    tasks = [asyncio.create_task(produce()), asyncio.create_task(fetch_all())]
+    written = 0
+    try:
+        while (row := await rows_queue.get()) is not None:
+            writer.write(row)
+            written += 1
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return written, failed
+
+
+def _parse_date(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, use YYYY-MM-DD[ HH:MM:SS]") from e
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export Felicity Solar snapshots without Home Assistant.")
+    parser.add_argument("-u", "--username", default=os.environ.get("FELICITY_USERNAME"), help="account username (or FELICITY_USERNAME)")
+    parser.add_argument("-p", "--password-hash", default=os.environ.get("FELICITY_PASSWORD_HASH"), help="account password hash (or FELICITY_PASSWORD_HASH)")
+    parser.add_argument("--base-url", default=BASE_URL, help="API base URL, e.g. a local stand-in server")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="jsonl", help="output format (default: jsonl)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout; required for parquet)")
+    parser.add_argument("--fields", help="comma-separated columns for csv and parquet (default: those of the first rows)")
+    parser.add_argument("-d", "--device", action="append", dest="devices", help="only export this serial (repeatable)")
+    parser.add_argument("--start", type=_parse_date, help="export history from this date instead of current snapshots")
+    parser.add_argument("--end", type=_parse_date, help="end of the history range (default: now)")
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP_MINUTES, help=f"history step in minutes (default: {DEFAULT_STEP_MINUTES})")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"concurrent requests (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    if not args.username or not args.password_hash:
+        parser.error("username and password hash are required")
+    if args.format == "parquet" and not args.output:
+        parser.error("parquet export needs --output")
+    if args.step < 1 or args.concurrency < 1:
+        parser.error("--step and --concurrency must be at least 1")
+    return args
+
+
+async def _async_main(args: argparse.Namespace) -> int:
+    fields = [field.strip() for field in args.fields.split(",")] if args.fields else None
+    output = None
+    if args.format == "parquet":
+        writer = ParquetWriter(args.output, fields)
+    else:
+        output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+        writer = CsvWriter(output, fields) if args.format == "csv" else JsonlWriter(output)
+
+    try:
+        async with FelicitySolarClient(args.username, args.password_hash, base_url=args.base_url) as client:
+            written, failed = await export_snapshots(
+                client,
+                writer,
+                devices=args.devices,
+                start=args.start,
+                end=args.end,
+                step=timedelta(minutes=args.step),
+                concurrency=args.concurrency,
+            )
+    except FelicitySolarApiError as e:
+        _LOGGER.error(f"Export failed: {e}")
+        return 1
+    finally:
+        writer.close()
+        if output is not None and output is not sys.stdout:
+            output.close()
+
+    _LOGGER.info(f"Exported {written} snapshots, {failed} requests failed")
+    return 1 if failed and not written else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, stream=sys.stderr, format="%(levelname)s %(message)s")
+    if not args.verbose:
+        # Device discovery logs every device at info level
+        logging.getLogger(FelicitySolarClient.__module__).setLevel(logging.WARNING)
+    return asyncio.run(_async_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""Local relay sharing one entry's snapshots with other Home Assistant instances.
+
+The serving side exposes the latest snapshots of an entry at ``RELAY_URL``: a plain
+GET returns the current state, a websocket upgrade returns the same state and then
+pushes every new snapshot. Requests authenticate with the entry's relay token as a
+bearer token. The consuming side subscribes to such a relay and feeds the snapshots
+into its coordinator as pushes, so the cloud is polled once however many instances
+consume the data.
+
+Snapshots travel with the time the relay received them, so a subscriber skips the ones
+it already has. A device whose data expired on the relay is sent as ``unavailable``.
+"""
+import asyncio
+import hmac
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import aiohttp
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    POLL_GROUP_ANY,
+    CONF_RELAY,
+    CONF_RELAY_TOKEN,
+    RELAY_URL,
+    RELAY_CONNECTIONS,
+    RELAY_RETRY_DELAY,
+    RELAY_MAX_RETRY_DELAY,
+    RELAY_QUEUE_SIZE,
+)
+from .coordinator import FelicitySolarCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between websocket pings, so dead connections are noticed on both sides
+HEARTBEAT_INTERVAL = 30
+
+REQUEST_TIMEOUT = 15
+
+
+def _last_updated(coordinator: FelicitySolarCoordinator, device_sn: str) -> Optional[str]:
+    """Return when the relay received the current snapshot of a device."""
+    last_updated = coordinator.get_last_updated(device_sn)
+    return last_updated.isoformat() if last_updated else None
+
+
+def _relay_state(coordinator: FelicitySolarCoordinator) -> Dict[str, Any]:
+    """Return the inventory and the current snapshots of an entry."""
+    device_sns = [device_sn for device_sn in coordinator.snapshots if not coordinator.is_stale(device_sn)]
+    return {
+        "type": "state",
+        "devices": [
+            {key: value for key, value in device.items() if key != "device_name"}
+            for device in coordinator.devices.values()
+        ],
+        "snapshots": {device_sn: coordinator.snapshots[device_sn] for device_sn in device_sns},
+        "last_updated": {device_sn: _last_updated(coordinator, device_sn) for device_sn in device_sns},
+    }
+
+
+class FelicitySolarRelayView(HomeAssistantView):
+    """Serve the snapshots of relay-enabled entries."""
+
+    url = RELAY_URL
+    name = "api:felicity_solar:relay"
+    # Authenticated with the entry's relay token instead of a Home Assistant user
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+
+    async def get(self, request: web.Request, entry_id: str) -> web.StreamResponse:
+        """Return the current state, or stream it over a websocket."""
+        entry = self.hass.config_entries.async_get_entry(entry_id)
+        coordinator = self.hass.data.get(DOMAIN, {}).get(entry_id)
+        if entry is None or not entry.options.get(CONF_RELAY) or not isinstance(coordinator, FelicitySolarCoordinator):
+            return web.json_response({"error": "relay not enabled"}, status=404)
+
+        token = entry.data.get(CONF_RELAY_TOKEN, "")
+        authorization = request.headers.get("Authorization", "")
+        if not token or not hmac.compare_digest(authorization, f"Bearer {token}"):
+            return web.json_response({"error": "invalid token"}, status=401)
+
+        if request.headers.get("Upgrade", "").lower() != "websocket":
+            return web.json_response(_relay_state(coordinator))
+        return await self._async_stream(request, entry_id, coordinator)
+
+    async def _async_stream(self, request: web.Request, entry_id: str, coordinator: FelicitySolarCoordinator) -> web.WebSocketResponse:
+        """Send the current state and then every new snapshot until the peer disconnects."""
+        websocket = web.WebSocketResponse(heartbeat=HEARTBEAT_INTERVAL)
+        await websocket.prepare(request)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=RELAY_QUEUE_SIZE)
+        unsubscribers: Dict[str, CALLBACK_TYPE] = {}
+
+        @callback
+        def _async_send(message: Dict[str, Any]) -> None:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                if websocket.closed:
+                    return
+                _LOGGER.warning(f"Relay subscriber {request.remote} is not keeping up, disconnecting it")
+                self.hass.async_create_task(websocket.close())
+
+        @callback
+        def _async_send_devices() -> None:
+            _async_send({"type": "devices", "devices": _relay_state(coordinator)["devices"]})
+
+        @callback
+        def _async_subscribe(device_sn: str) -> None:
+            @callback
+            def _async_snapshot(snapshot: Optional[Dict[str, Any]]) -> None:
+                if snapshot is None and device_sn not in coordinator.devices:
+                    # The device was removed from the relay's inventory
+                    unsubscribers.pop(device_sn)()
+                    _async_send_devices()
+                elif snapshot is None:
+                    _async_send({"type": "unavailable", "device_sn": device_sn})
+                elif not coordinator.is_stale(device_sn):
+                    _async_send({
+                        "type": "snapshot",
+                        "device_sn": device_sn,
+                        "snapshot": snapshot,
+                        "last_updated": _last_updated(coordinator, device_sn),
+                    })
+
+            unsubscribers[device_sn] = coordinator.async_add_listener(device_sn, POLL_GROUP_ANY, _async_snapshot)
+
+        @callback
+        def _async_devices_added(devices_info: List[Dict[str, Any]]) -> None:
+            for device in devices_info:
+                _async_subscribe(device["deviceSn"])
+            _async_send_devices()
+
+        _async_send(_relay_state(coordinator))
+        for device_sn in coordinator.devices:
+            _async_subscribe(device_sn)
+        unsubscribe_devices = coordinator.async_add_devices_listener(_async_devices_added)
+
+        connections: Set[web.WebSocketResponse] = self.hass.data[DOMAIN].setdefault(RELAY_CONNECTIONS, {}).setdefault(entry_id, set())
+        connections.add(websocket)
+        _LOGGER.info(f"Relay subscriber {request.remote} connected")
+
+        async def _async_sender() -> None:
+            while True:
+                await websocket.send_json(await queue.get())
+
+        sender = self.hass.async_create_background_task(_async_sender(), f"{DOMAIN} relay sender")
+        try:
+            # Subscribers only listen; reading keeps the heartbeat going and detects the close
+            async for _message in websocket:
+                pass
+        finally:
+            sender.cancel()
+            unsubscribe_devices()
+            for unsubscribe in unsubscribers.values():
+                unsubscribe()
+            connections.discard(websocket)
+            _LOGGER.info(f"Relay subscriber {request.remote} disconnected")
+        return websocket
+
+
+@callback
+def async_register_relay_view(hass: HomeAssistant) -> None:
+    """Register the relay endpoint shared by every entry."""
+    hass.http.register_view(FelicitySolarRelayView(hass))
+
+
+@callback
+def async_close_relay_connections(hass: HomeAssistant, entry_id: str) -> None:
+    """Disconnect every relay subscriber of an entry."""
+    connections = hass.data.get(DOMAIN, {}).get(RELAY_CONNECTIONS, {}).pop(entry_id, set())
+    for websocket in connections:
+        hass.async_create_task(websocket.close())
+
+
+async def async_get_relay_state(hass: HomeAssistant, url: str, token: str) -> Dict[str, Any]:
+    """Request the inventory and the current snapshots of an upstream relay."""
+    session = async_get_clientsession(hass)
+    async with session.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+class RelaySubscriber:
+    """Feed the snapshots of an upstream relay into a coordinator.
+
+    The subscriber reconnects with exponential backoff and receives the full state on
+    every connection, so nothing is missed beyond the snapshots of the outage itself.
+    While disconnected, the devices age through the coordinator's staleness window.
+    Inventory changes of the relay are handed to ``devices_callback``.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: FelicitySolarCoordinator, url: str, token: str, devices_callback: Callable[[List[Dict[str, Any]]], None]):
+        self.hass = hass
+        self.coordinator = coordinator
+        self._url = url
+        self._headers = {"Authorization": f"Bearer {token}"}
+        self._devices_callback = devices_callback
+        self._task: Optional[asyncio.Task] = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start the subscription in the background."""
+        self._task = self.hass.async_create_background_task(self._async_run(), f"{DOMAIN} relay subscriber")
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the subscription."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_run(self) -> None:
+        """Stay subscribed, reconnecting after every failure."""
+        session = async_get_clientsession(self.hass)
+        delay = RELAY_RETRY_DELAY
+        while True:
+            try:
+                async with session.ws_connect(self._url, headers=self._headers, heartbeat=HEARTBEAT_INTERVAL) as websocket:
+                    _LOGGER.info(f"Subscribed to relay {self._url}")
+                    delay = RELAY_RETRY_DELAY
+                    async for message in websocket:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            self._async_handle_message(message.json())
+                        elif message.type == aiohttp.WSMsgType.ERROR:
+                            break
+                _LOGGER.warning(f"Relay {self._url} closed the subscription, reconnecting in {delay} seconds")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _LOGGER.warning(f"Error subscribing to relay {self._url}: {e}, retrying in {delay} seconds")
+            self.coordinator.async_push_lost()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RELAY_MAX_RETRY_DELAY)
+
+    @callback
+    def _async_handle_message(self, message: Dict[str, Any]) -> None:
+        """Apply one relay message to the coordinator."""
+        message_type = message.get("type")
+        if message_type in ("state", "devices") and message.get("devices"):
+            self._devices_callback(message["devices"])
+        if message_type == "state":
+            last_updated = message.get("last_updated") or {}
+            for device_sn, snapshot in (message.get("snapshots") or {}).items():
+                self.coordinator.async_push_snapshot(device_sn, snapshot, self._parse_time(last_updated.get(device_sn)))
+        elif message_type == "snapshot" and message.get("snapshot"):
+            self.coordinator.async_push_snapshot(
+                message.get("device_sn"), message["snapshot"], self._parse_time(message.get("last_updated"))
+            )
+        elif message_type == "unavailable":
+            self.coordinator.async_push_unavailable(message.get("device_sn"))
+
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[datetime]:
+        """Parse a relay timestamp; relays without timestamps send every snapshot as new."""
+        return dt_util.parse_datetime(value) if value else None
@@ -0,0 +1,101 @@
+"""Incremental rolling-window statistics over polled snapshots."""
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from .util import to_float
+
+# Window key -> duration in seconds
+ROLLING_WINDOWS = {
+    "5min": 300,
+    "1h": 3600,
+}
+
+# Snapshot fields tracked for every device
+ROLLING_FIELDS = ("pvTotalPower", "bmsPower", "battSoc", "tempMax", "devTempMax")
+
+ROLLING_STATISTICS = ("min", "max", "mean")
+
+
+class RollingWindow:
+    """Time-based sliding window with amortized O(1) min, max and mean.
+
+    Minimum and maximum are kept in monotonic deques, the mean in a running sum, so
+    adding or expiring a sample never rescans the window. Memory is bounded by the
+    number of samples that fit in the window duration.
+    """
+
+    def __init__(self, duration: float):
+        self._duration = duration
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._min: Deque[Tuple[float, float]] = deque()
+        self._max: Deque[Tuple[float, float]] = deque()
+        self._sum = 0.0
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a sample and expire the ones that left the window."""
+        self._samples.append((timestamp, value))
+        self._sum += value
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+        self.expire(timestamp)
+
+    def expire(self, now: float) -> None:
+        """Drop samples older than the window duration."""
+        cutoff = now - self._duration
+        while self._samples and self._samples[0][0] <= cutoff:
+            _, value = self._samples.popleft()
+            self._sum -= value
+        while self._min and self._min[0][0] <= cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= cutoff:
+            self._max.popleft()
+        if not self._samples:
+            # Reset the running sum so float error cannot accumulate across empty periods
+            self._sum = 0.0
+
+    @property
+    def min(self) -> Optional[float]:
+        """Return the window minimum."""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        """Return the window maximum."""
+        return self._max[0][1] if self._max else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Return the window mean."""
+        return self._sum / len(self._samples) if self._samples else None
+
+
+class DeviceRollingStatistics:
+    """Rolling windows of every tracked field of one device."""
+
+    def __init__(self):
+        self._windows: Dict[Tuple[str, str], RollingWindow] = {
+            (field, window): RollingWindow(duration)
+            for field in ROLLING_FIELDS
+            for window, duration in ROLLING_WINDOWS.items()
+        }
+
+    def add_snapshot(self, timestamp: float, snapshot: Dict[str, Any]) -> None:
+        """Feed the tracked fields of a snapshot into their windows."""
+        for (field, _), rolling_window in self._windows.items():
+            value = to_float(snapshot.get(field))
+            if value is not None:
+                rolling_window.add(timestamp, value)
+
+    def get(self, field: str, window: str, statistic: str, now: float) -> Optional[float]:
+        """Return a statistic of a field over a window."""
+        rolling_window = self._windows[(field, window)]
+        rolling_window.expire(now)
+        value = getattr(rolling_window, statistic)
+        return round(value, 2) if value is not None else None
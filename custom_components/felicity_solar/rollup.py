@@ -0,0 +1,96 @@
+"""Hourly rollups of high-frequency fields for the recorder's external statistics."""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .util import to_float
+
+# Snapshot field -> (statistic name, unit) of the fields rolled up in statistics rollup mode
+ROLLUP_FIELDS = {
+    "pvTotalPower": ("PV Total Power", "W"),
+    "pvPower": ("PV1 Power", "W"),
+    "pv2Power": ("PV2 Power", "W"),
+    "pv3Power": ("PV3 Power", "W"),
+    "pv4Power": ("PV4 Power", "W"),
+    "acRInPower": ("AC Input Power", "W"),
+    "acTotalOutActPower": ("AC Output Power", "W"),
+    "meterPower": ("Meter Power", "W"),
+    "bmsPower": ("Battery Power", "W"),
+    "pvVolt": ("PV1 Voltage", "V"),
+    "pv2Volt": ("PV2 Voltage", "V"),
+    "pv3Volt": ("PV3 Voltage", "V"),
+    "acRInVolt": ("AC Input Voltage", "V"),
+    "acROutVolt": ("AC Output Voltage", "V"),
+    "battVolt": ("Battery Voltage", "V"),
+    "pvInCurr": ("PV1 Current", "A"),
+    "pv2InCurr": ("PV2 Current", "A"),
+    "pv3InCurr": ("PV3 Current", "A"),
+    "acRInCurr": ("AC Input Current", "A"),
+    "acROutCurr": ("AC Output Current", "A"),
+    "battCurr": ("Battery Current", "A"),
+}
+
+
+def hour_start(timestamp: datetime) -> datetime:
+    """Return the start of the hour containing a timestamp."""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class _HourBucket:
+    """Running mean, minimum and maximum of one field over one hour."""
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self._count = 0
+        self._sum = 0.0
+        self._min: Optional[float] = None
+        self._max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        self._count += 1
+        self._sum += value
+        self._min = value if self._min is None else min(self._min, value)
+        self._max = value if self._max is None else max(self._max, value)
+
+    def as_statistic(self) -> Dict[str, Any]:
+        """Return the bucket as a recorder statistic row."""
+        return {"start": self.start, "mean": self._sum / self._count, "min": self._min, "max": self._max}
+
+
+class HourlyRollup:
+    """Hourly mean, minimum and maximum of the rollup fields of every device.
+
+    Samples only update a running bucket per device and field, so memory stays
+    constant whatever the polling rate. Closed hours are collected until they are
+    written to the recorder in one batch.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], _HourBucket] = {}
+        self._completed: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+
+    def add_snapshot(self, timestamp: datetime, device_sn: str, snapshot: Dict[str, Any]) -> None:
+        """Feed the rollup fields of a snapshot into the bucket of its hour."""
+        start = hour_start(timestamp)
+        for field in ROLLUP_FIELDS:
+            value = to_float(snapshot.get(field))
+            if value is None:
+                continue
+
+            key = (device_sn, field)
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.start != start:
+                if bucket is not None:
+                    self._completed.setdefault(key, []).append(bucket.as_statistic())
+                bucket = self._buckets[key] = _HourBucket(start)
+            bucket.add(value)
+
+    def pop_completed(self, now: datetime) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Close every bucket of an earlier hour and return all closed hours."""
+        current = hour_start(now)
+        for key, bucket in list(self._buckets.items()):
+            if bucket.start < current:
+                self._completed.setdefault(key, []).append(bucket.as_statistic())
+                del self._buckets[key]
+
+        completed, self._completed = self._completed, {}
+        return completed
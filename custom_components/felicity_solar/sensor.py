@@ -1,5 +1,5 @@
 """Felicity Solar integration v2.0 - Using snapshot endpoint for comprehensive data."""
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import RestoreSensor, SensorEntity, SensorDeviceClass
 from homeassistant.const import (
     UnitOfPower,
     UnitOfEnergy,
@@ -7,19 +7,24 @@ from homeassistant.const import (
     UnitOfElectricCurrent,
     UnitOfFrequency,
     UnitOfTemperature,
+    UnitOfTime,
     PERCENTAGE
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 
-from datetime import timedelta
-
-from .const import DOMAIN, BASE_URL, PLANT_LIST_ENDPOINT, DEVICE_SNAPSHOT_ENDPOINT
-from .auth import FelicitySolarAuth
-import requests
-from datetime import datetime
+from .const import (
+    DOMAIN,
+    POLL_GROUP_FAST,
+    POLL_GROUP_MEDIUM,
+    POLL_GROUP_SLOW,
+    POLL_GROUP_ANY,
+)
+from .coordinator import FelicitySolarCoordinator, plant_identifier
+from .rolling import ROLLING_STATISTICS, ROLLING_WINDOWS
 import logging
+import time
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,210 +34,168 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Felicity Solar sensors."""
-    username = config_entry.data.get("username")
-    password_hash = config_entry.data.get("password_hash")
-    scan_interval = config_entry.data.get("scan_interval", 30)
-    
-    # Set the scan interval for all sensors
-    update_interval = timedelta(seconds=scan_interval)
+    coordinator: FelicitySolarCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    devices_info = list(coordinator.devices.values())
     
-    # Create shared auth instance
-    auth = FelicitySolarAuth(username, password_hash)
+    _LOGGER.info(f"Setting up Felicity Solar for {len(devices_info)} devices, polling intervals: {coordinator.intervals}")
     
-    _LOGGER.info("Starting Felicity Solar setup...")
+    # Devices and plants that already have entities, shared with rediscovery
+    known_devices = set()
+    known_plants = set()
     
-    # Get all devices info from API
-    try:
-        devices_info = await hass.async_add_executor_job(_get_all_devices_info, auth)
-        _LOGGER.info(f"Retrieved device info: {devices_info}")
-    except Exception as e:
-        _LOGGER.error(f"Error getting device info: {e}")
-        return
+    @callback
+    def _async_add_devices(new_devices_info) -> None:
+        """Create the sensors of devices and plants that have none yet."""
+        all_sensors = []
         
-    if not devices_info:
-        _LOGGER.error("Could not get any device information from API")
-        return
-    
-    _LOGGER.info(f"Setting up Felicity Solar for {len(devices_info)} devices, scan interval: {scan_interval}s")
-    
-    # Create sensors for each device
-    all_sensors = []
-    
-    for device_info in devices_info:
-        plant_id = device_info.get("plantId")
-        device_sn = device_info.get("deviceSn")
-        device_type = device_info.get("deviceType", "OC")
-        device_identifier = device_info.get("deviceIdentifier")
-
-        # Inject device_name from config_entry if present
-        device_info["device_name"] = config_entry.data.get("device_name", "")
-        _LOGGER.info(f"Creating sensors for device: {device_identifier}")
+        for device_info in new_devices_info:
+            if device_info.get("deviceSn") in known_devices:
+                continue
+            known_devices.add(device_info.get("deviceSn"))
+            all_sensors.extend(_create_device_sensors(config_entry, coordinator, device_info))
         
-        # Create comprehensive sensors based on snapshot endpoint for this device
-        device_sensors = [
-            # Power Generation
-            FelicityPvTotalPowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv1PowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv2PowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv3PowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv4PowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # PV Voltage & Current
-            FelicityPv1VoltageSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv2VoltageSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv3VoltageSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv1CurrentSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv2CurrentSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityPv3CurrentSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # AC Input (Grid)
-            FelicityAcInputVoltageSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityAcInputCurrentSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityAcInputFrequencySensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityAcInputPowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # AC Output (Load)
-            FelicityAcOutputVoltageSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityAcOutputCurrentSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityAcOutputFrequencySensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityAcOutputPowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # Energy Totals
-            FelicityTotalEnergySensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityTodayEnergySensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityGridFeedTodaySensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityGridFeedTotalSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # Temperatures
-            FelicityTempMaxSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityDeviceTempMaxSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # Load & Grid
-            FelicityLoadPercentSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityMeterPowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # Device Status
-            FelicityDeviceStatusSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityWifiSignalSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-
-            # Battery Sensors
-            FelicityBatterySocSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityBatteryVoltageSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityBatteryCurrentSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-            FelicityBatteryPowerSensor(plant_id, auth, device_sn, device_type, scan_interval, device_info),
-        ]
+        # Plant aggregate sensors computed locally from the fetched snapshots
+        for device_info in new_devices_info:
+            plant_id = device_info.get("plantId")
+            if plant_id in known_plants:
+                continue
+            known_plants.add(plant_id)
+            plant_name = device_info.get("plantName", "Unknown Plant")
+            all_sensors.extend(_create_plant_sensors(config_entry, coordinator, plant_id, plant_name))
+            _LOGGER.info(f"Added plant aggregate sensors for plant '{plant_name}' (ID: {plant_id})")
         
-        # Add this device's sensors to the main list
-        all_sensors.extend(device_sensors)
-        _LOGGER.info(f"Added {len(device_sensors)} sensors for device {device_identifier}")
-    
-    # Add all sensors from all devices
-    if all_sensors:
-        _LOGGER.info(f"Setting up {len(all_sensors)} total sensors")
-        async_add_entities(all_sensors, True)
-    else:
+        if all_sensors:
+            _LOGGER.info(f"Setting up {len(all_sensors)} total sensors")
+            async_add_entities(all_sensors)
+    
+    _async_add_devices(devices_info)
+    if not known_devices:
         _LOGGER.error("No sensors created - check device discovery")
+    
+    # Devices commissioned later are added by background rediscovery
+    config_entry.async_on_unload(coordinator.async_add_devices_listener(_async_add_devices))
 
-def _get_all_devices_info(auth: FelicitySolarAuth):
-    """Get all plants and devices information from API."""
-    try:
-        # Login first to get fresh token
-        if not auth.login():
-            _LOGGER.error("Failed to login during device info retrieval")
-            return []
-            
-        payload = {
-            "pageNum": 1,
-            "pageSize": 100,  # Get more devices
-            "plantName": "",
-            "deviceSn": "",
-            "status": "",
-            "isCollected": "",
-            "plantType": "",
-            "onGridType": "",
-            "tagName": "",
-            "realName": "",
-            "orgCode": "",
-            "authorized": "",
-            "cityId": "",
-            "countryId": "",
-            "provinceId": ""
-        }
-        
-        headers = auth.get_auth_headers()
-        if not headers:
-            return []
-            
-        _LOGGER.debug(f"Getting plant list with headers: {headers}")
-        
-        response = requests.post(
-            BASE_URL + PLANT_LIST_ENDPOINT,
-            json=payload,
-            headers=headers,
-            timeout=15
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        _LOGGER.debug(f"Plant list response: {data}")
-        
-        devices_info = []
-        if data.get("code") == 200 and data.get("data", {}).get("dataList"):
-            # Get all plants and their devices
-            for plant in data["data"]["dataList"]:
-                plant_id = plant["id"]
-                plant_name = plant.get("plantName", "Unknown")
-                device_list = plant.get("plantDeviceList", [])
-                
-                for device in device_list:
-                    device_sn = device.get("deviceSn")
-                    battery_capacity = device.get("batteryCapacity", 0)
-                    device_type = device.get("deviceType", "OC")
-
-                    # Always use SN as model and identifier
-                    device_model = device_sn
-
-                    if device_sn:
-                        device_identifier = device_sn
-                        devices_info.append({
-                            "plantId": plant_id,
-                            "plantName": plant_name,
-                            "deviceSn": device_sn,
-                            "deviceModel": device_model,
-                            "deviceType": device_type,
-                            "batteryCapacity": battery_capacity,
-                            "deviceIdentifier": device_identifier
-                        })
-                        _LOGGER.info(f"Found device: {device_identifier} in plant '{plant_name}' (ID: {plant_id})")
-        
-        return devices_info
-    except Exception as e:
-        _LOGGER.error(f"Error getting devices info: {e}")
-        return []
+def _create_device_sensors(config_entry: ConfigEntry, coordinator: FelicitySolarCoordinator, device_info: dict) -> list:
+    """Create every sensor of one device."""
+    plant_id = device_info.get("plantId")
+    device_sn = device_info.get("deviceSn")
+    device_type = device_info.get("deviceType", "OC")
+    device_identifier = device_info.get("deviceIdentifier")
+
+    # Inject device_name from config_entry if present
+    device_info["device_name"] = config_entry.data.get("device_name", "")
+    _LOGGER.info(f"Creating sensors for device: {device_identifier}")
+    
+    # Create comprehensive sensors based on snapshot endpoint for this device
+    device_sensors = [
+        # Power Generation
+        FelicityPvTotalPowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv1PowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv2PowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv3PowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv4PowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # PV Voltage & Current
+        FelicityPv1VoltageSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv2VoltageSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv3VoltageSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv1CurrentSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv2CurrentSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityPv3CurrentSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # AC Input (Grid)
+        FelicityAcInputVoltageSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityAcInputCurrentSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityAcInputFrequencySensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityAcInputPowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # AC Output (Load)
+        FelicityAcOutputVoltageSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityAcOutputCurrentSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityAcOutputFrequencySensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityAcOutputPowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # Energy Totals
+        FelicityTotalEnergySensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityTodayEnergySensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityGridFeedTodaySensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityGridFeedTotalSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # Temperatures
+        FelicityTempMaxSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityDeviceTempMaxSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # Load & Grid
+        FelicityLoadPercentSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityMeterPowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # Device Status
+        FelicityDeviceStatusSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityWifiSignalSensor(plant_id, coordinator, device_sn, device_type, device_info),
+
+        # Battery Sensors
+        FelicityBatterySocSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityBatteryVoltageSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityBatteryCurrentSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityBatteryPowerSensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityBatteryTimeToEmptySensor(plant_id, coordinator, device_sn, device_type, device_info),
+        FelicityBatteryTimeToFullSensor(plant_id, coordinator, device_sn, device_type, device_info),
 
-class FelicitySolarSensorBase(SensorEntity):
+        # PV String Health
+        FelicityPvStringHealthSensor(plant_id, coordinator, device_sn, device_type, device_info),
+    ]
+    
+    # Rolling-window statistics computed incrementally from the polled snapshots
+    for field in ROLLING_STATISTIC_FIELDS:
+        for window in ROLLING_WINDOWS:
+            for statistic in ROLLING_STATISTICS:
+                device_sensors.append(FelicityRollingStatisticSensor(
+                    plant_id, coordinator, device_sn, device_type, device_info, field, window, statistic
+                ))
+    
+    _LOGGER.info(f"Added {len(device_sensors)} sensors for device {device_identifier}")
+    return device_sensors
+
+def _create_plant_sensors(config_entry: ConfigEntry, coordinator: FelicitySolarCoordinator, plant_id, plant_name: str) -> list:
+    """Create the aggregate sensors of one plant."""
+    return [
+        FelicityPlantPvPowerSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantLoadPowerSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantGridPowerSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantMeterPowerSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantBatteryPowerSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantBatterySocSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantTodayEnergySensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantTotalEnergySensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantTempMaxSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantDeviceTempMaxSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+        FelicityPlantUnderperformingStringsSensor(coordinator, config_entry.entry_id, plant_id, plant_name),
+    ]
+
+class FelicitySolarSensorBase(RestoreSensor):
     """Base class for Felicity Solar sensors."""
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
+    # Polling group deciding how often the coordinator refreshes this sensor, None for no device listener
+    _poll_group = POLL_GROUP_FAST
+    # Snapshot field written as hourly external statistics in statistics rollup mode
+    _rollup_field = None
+    
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
         self._plant_id = plant_id
-        self._auth = auth
+        self._coordinator = coordinator
         self._device_sn = device_sn
         self._device_type = device_type
-        self._attr_available = True
-        self._snapshot_data = None
-        self._scan_interval = scan_interval
+        self._snapshot_data = coordinator.snapshots.get(device_sn)
+        self._attr_available = self._snapshot_data is not None
+        # Last native value from the restore-state cache, served until the first snapshot arrives
+        self._restored_value = None
         self._device_info = device_info or {}
         
-        # Set up device info for Home Assistant device registry
-        device_identifier = self._get_device_identifier()
-        device_model = self._device_info.get("deviceModel", "Unknown")
-        plant_name = self._device_info.get("plantName", "Unknown Plant")
-        
     @property  
     def device_info(self):
         """Return device information to link entities with devices."""
         device_identifier = self._get_device_identifier()
-        device_model = self._get_string_value("deviceModel", self._device_info.get("deviceModel", "Unknown"))
+        device_model = self._get_device_model()
         configuration_url = f"https://shine.felicityess.com/login"
         
         return {
@@ -250,7 +213,7 @@ class FelicitySolarSensorBase(SensorEntity):
         device_name = self._device_info.get("device_name")
         if not device_name or device_name.strip() == "":
             # Fallback to deviceModel from snapshot data or device_info
-            device_name = self._get_string_value("deviceModel", self._device_info.get("deviceModel", "Unknown"))
+            device_name = self._get_device_model()
         
         # Use the sensor type from the static _attr_name (set in child class)
         if hasattr(self, "_attr_name") and self._attr_name:
@@ -264,138 +227,94 @@ class FelicitySolarSensorBase(SensorEntity):
 
     @property
     def should_poll(self) -> bool:
-        """Return True if entity should be polled."""
-        return True
-        
+        """Return False, updates are pushed by the coordinator."""
+        return False
+
+    @property
+    def state_class(self):
+        """Return no state class for fields rolled up into hourly external statistics."""
+        if self._rollup_field and self._coordinator.rollup is not None:
+            return None
+        return super().state_class
+
     @property
-    def scan_interval(self) -> timedelta:
-        """Return the scan interval for this sensor."""
-        return timedelta(seconds=self._scan_interval)
+    def extra_state_attributes(self):
+        """Return whether the value is restored or cached, and when cached data was received.
+
+        ``last_updated`` is only added while stale, so regular polls keep the attributes
+        unchanged and the recorder only stores real value changes.
+        """
+        restored = self._snapshot_data is None and self._restored_value is not None
+        if not restored and not self._coordinator.is_stale(self._device_sn):
+            return {"stale": False}
+        last_updated = self._coordinator.get_last_updated(self._device_sn)
+        return {
+            "stale": True,
+            "last_updated": last_updated.isoformat() if last_updated else None,
+        }
+    
+    def _get_device_model(self):
+        """Get the device model from snapshot data, falling back to device_info."""
+        if self._snapshot_data and self._snapshot_data.get("deviceModel"):
+            return str(self._snapshot_data["deviceModel"])
+        return self._device_info.get("deviceModel", "Unknown")
     
     def _get_device_identifier(self):
-        """Get device identifier, fetching from snapshot API if not available."""
+        """Get device identifier, falling back to the snapshot device model if not available."""
         # First try to get from device_info
         if self._device_info.get("deviceIdentifier"):
             return self._device_info.get("deviceIdentifier")
         
-        # If not available, try to get device model from snapshot API
-        try:
-            device_model = self._get_device_model_from_snapshot()
-            if device_model and device_model != "Unknown":
-                device_identifier = f"{device_model}-{self._device_sn}"
-                # Update device_info with the found information
-                self._device_info["deviceModel"] = device_model
-                self._device_info["deviceIdentifier"] = device_identifier
-                return device_identifier
-        except Exception as e:
-            _LOGGER.debug(f"Could not get device model from snapshot: {e}")
+        # If not available, try to get device model from the latest snapshot
+        device_model = self._get_device_model_from_snapshot()
+        if device_model and device_model != "Unknown":
+            device_identifier = f"{device_model}-{self._device_sn}"
+            # Update device_info with the found information
+            self._device_info["deviceModel"] = device_model
+            self._device_info["deviceIdentifier"] = device_identifier
+            return device_identifier
         
         # Fallback to Unknown
         return f"Unknown-{self._device_sn}"
     
     def _get_device_model_from_snapshot(self):
-        """Get device model from snapshot API."""
-        try:
-            # Login if needed
-            if not self._auth.get_valid_token():
-                if not self._auth.login():
-                    return "Unknown"
-            
-            payload = {
-                "deviceSn": self._device_sn,
-                "deviceType": self._device_type,
-                "dateStr": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            headers = self._auth.get_auth_headers()
-            if not headers:
-                return "Unknown"
-                
-            response = requests.post(
-                BASE_URL + DEVICE_SNAPSHOT_ENDPOINT,
-                json=payload,
-                headers=headers,
-                timeout=15
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") == 200 and data.get("data"):
-                device_model = data["data"].get("deviceModel")
-                if device_model:
-                    _LOGGER.info(f"Retrieved device model from snapshot API: {device_model} for device {self._device_sn}")
-                    return device_model
-            
-            return "Unknown"
-            
-        except Exception as e:
-            _LOGGER.debug(f"Error getting device model from snapshot: {e}")
-            return "Unknown"
-    
-    def get_snapshot_data(self):
-        """Get device snapshot data from API."""
-        try:
-            payload = {
-                "deviceSn": self._device_sn,
-                "deviceType": self._device_type,
-                "dateStr": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            headers = self._auth.get_auth_headers()
-            if not headers:
-                _LOGGER.error("No authentication headers available")
-                return None
-                
-            _LOGGER.debug(f"Getting snapshot data with payload: {payload}")
-            _LOGGER.debug(f"Using headers: {headers}")
-                
-            response = requests.post(
-                BASE_URL + DEVICE_SNAPSHOT_ENDPOINT,
-                json=payload,
-                headers=headers,
-                timeout=15
+        """Get device model from the coordinator's latest snapshot."""
+        snapshot = self._coordinator.snapshots.get(self._device_sn) or {}
+        return snapshot.get("deviceModel") or "Unknown"
+    
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value and subscribe to snapshots of this sensor's polling group."""
+        await super().async_added_to_hass()
+        if self._snapshot_data is None:
+            last_sensor_data = await self.async_get_last_sensor_data()
+            if last_sensor_data is not None and last_sensor_data.native_value is not None:
+                self._restored_value = last_sensor_data.native_value
+                self._attr_available = True
+        if self._poll_group is not None:
+            self.async_on_remove(
+                self._coordinator.async_add_listener(self._device_sn, self._poll_group, self._handle_snapshot)
             )
-            response.raise_for_status()
-            data = response.json()
-            
-            _LOGGER.debug(f"Snapshot data response: {data}")
-            
-            if data.get("code") == 200 and data.get("data"):
-                return data["data"]
-            else:
-                _LOGGER.error(f"Snapshot API error: {data.get('message', 'Unknown error')}")
-                return None
-            
-        except Exception as e:
-            _LOGGER.error(f"Error fetching snapshot data: {e}")
-            return None
     
-    async def async_update(self):
-        """Update sensor data."""
-        try:
-            # Login if needed
-            if not self._auth.get_valid_token():
-                _LOGGER.info("Logging in to Felicity Solar API")
-                login_success = await self.hass.async_add_executor_job(self._auth.login)
-                if not login_success:
-                    _LOGGER.error("Failed to login to Felicity Solar API")
-                    self._attr_available = False
-                    return
-            
-            # Get snapshot data
-            self._snapshot_data = await self.hass.async_add_executor_job(self.get_snapshot_data)
-            self._attr_available = self._snapshot_data is not None
-            
-            if not self._attr_available:
-                _LOGGER.warning("No snapshot data available from Felicity Solar API")
-                
-        except Exception as e:
-            _LOGGER.error(f"Error updating sensor data: {e}")
-            self._attr_available = False
+    async def async_update(self) -> None:
+        """Refresh the device on demand, coalescing with fetches already in flight."""
+        await self._coordinator.async_request_refresh([self._device_sn])
+
+    @callback
+    def _handle_snapshot(self, snapshot) -> None:
+        """Update sensor data from a coordinator snapshot."""
+        if snapshot is not None:
+            self._snapshot_data = snapshot
+        self._attr_available = snapshot is not None
+        self.async_write_ha_state()
 
     def _get_float_value(self, key: str, default: float = 0.0) -> float:
         """Safely get float value from snapshot data, ignoring null values."""
         if not self._snapshot_data:
+            if self._restored_value is not None:
+                try:
+                    return float(self._restored_value)
+                except (ValueError, TypeError):
+                    return default
             return default
         value = self._snapshot_data.get(key)
         if value is None or value == "":
@@ -408,7 +327,7 @@ class FelicitySolarSensorBase(SensorEntity):
     def _get_string_value(self, key: str, default: str = "Unknown") -> str:
         """Safely get string value from snapshot data."""
         if not self._snapshot_data:
-            return default
+            return str(self._restored_value) if self._restored_value is not None else default
         value = self._snapshot_data.get(key)
         if value is None or value == "":
             return default
@@ -417,9 +336,11 @@ class FelicitySolarSensorBase(SensorEntity):
 # Power Generation Sensors
 class FelicityPvTotalPowerSensor(FelicitySolarSensorBase):
     """Total PV power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pvTotalPower"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         # Sanitize device identifier for unique_id (replace special characters)
         sanitized_id = device_identifier.replace("-", "_").replace(" ", "_").lower()
@@ -435,9 +356,11 @@ class FelicityPvTotalPowerSensor(FelicitySolarSensorBase):
 
 class FelicityPv1PowerSensor(FelicitySolarSensorBase):
     """PV1 power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pvPower"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV1 Power"
         sanitized_id = device_identifier.replace("-", "_").replace(" ", "_").lower()
@@ -452,9 +375,11 @@ class FelicityPv1PowerSensor(FelicitySolarSensorBase):
 
 class FelicityPv2PowerSensor(FelicitySolarSensorBase):
     """PV2 power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pv2Power"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV2 Power"
         self._attr_unique_id = f"felicity_{device_identifier}_pv2_power"
@@ -468,9 +393,11 @@ class FelicityPv2PowerSensor(FelicitySolarSensorBase):
 
 class FelicityPv3PowerSensor(FelicitySolarSensorBase):
     """PV3 power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pv3Power"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV3 Power"
         self._attr_unique_id = f"felicity_{device_identifier}_pv3_power"
@@ -484,9 +411,11 @@ class FelicityPv3PowerSensor(FelicitySolarSensorBase):
 
 class FelicityPv4PowerSensor(FelicitySolarSensorBase):
     """PV4 power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pv4Power"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV4 Power"
         self._attr_unique_id = f"felicity_{device_identifier}_pv4_power"
@@ -501,9 +430,11 @@ class FelicityPv4PowerSensor(FelicitySolarSensorBase):
 # PV Voltage Sensors
 class FelicityPv1VoltageSensor(FelicitySolarSensorBase):
     """PV1 voltage sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
+    _rollup_field = "pvVolt"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV1 Voltage"
         self._attr_unique_id = f"felicity_{device_identifier}_pv1_voltage"
@@ -517,9 +448,11 @@ class FelicityPv1VoltageSensor(FelicitySolarSensorBase):
 
 class FelicityPv2VoltageSensor(FelicitySolarSensorBase):
     """PV2 voltage sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
+    _rollup_field = "pv2Volt"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV2 Voltage"
         self._attr_unique_id = f"felicity_{device_identifier}_pv2_voltage"
@@ -533,9 +466,11 @@ class FelicityPv2VoltageSensor(FelicitySolarSensorBase):
 
 class FelicityPv3VoltageSensor(FelicitySolarSensorBase):
     """PV3 voltage sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
+    _rollup_field = "pv3Volt"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV3 Voltage"
         self._attr_unique_id = f"felicity_{device_identifier}_pv3_voltage"
@@ -550,9 +485,11 @@ class FelicityPv3VoltageSensor(FelicitySolarSensorBase):
 # PV Current Sensors
 class FelicityPv1CurrentSensor(FelicitySolarSensorBase):
     """PV1 current sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pvInCurr"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV1 Current"
         self._attr_unique_id = f"felicity_{device_identifier}_pv1_current"
@@ -566,9 +503,11 @@ class FelicityPv1CurrentSensor(FelicitySolarSensorBase):
 
 class FelicityPv2CurrentSensor(FelicitySolarSensorBase):
     """PV2 current sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pv2InCurr"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV2 Current"
         self._attr_unique_id = f"felicity_{device_identifier}_pv2_current"
@@ -582,9 +521,11 @@ class FelicityPv2CurrentSensor(FelicitySolarSensorBase):
 
 class FelicityPv3CurrentSensor(FelicitySolarSensorBase):
     """PV3 current sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "pv3InCurr"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} PV3 Current"
         self._attr_unique_id = f"felicity_{device_identifier}_pv3_current"
@@ -599,9 +540,11 @@ class FelicityPv3CurrentSensor(FelicitySolarSensorBase):
 # AC Input (Grid) Sensors
 class FelicityAcInputVoltageSensor(FelicitySolarSensorBase):
     """AC Input voltage sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
+    _rollup_field = "acRInVolt"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Input Voltage"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_input_voltage"
@@ -615,9 +558,11 @@ class FelicityAcInputVoltageSensor(FelicitySolarSensorBase):
 
 class FelicityAcInputCurrentSensor(FelicitySolarSensorBase):
     """AC Input current sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "acRInCurr"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Input Current"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_input_current"
@@ -631,9 +576,10 @@ class FelicityAcInputCurrentSensor(FelicitySolarSensorBase):
 
 class FelicityAcInputFrequencySensor(FelicitySolarSensorBase):
     """AC Input frequency sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Input Frequency"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_input_frequency"
@@ -647,9 +593,11 @@ class FelicityAcInputFrequencySensor(FelicitySolarSensorBase):
 
 class FelicityAcInputPowerSensor(FelicitySolarSensorBase):
     """AC Input power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "acRInPower"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Input Power"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_input_power"
@@ -664,9 +612,11 @@ class FelicityAcInputPowerSensor(FelicitySolarSensorBase):
 # AC Output (Load) Sensors
 class FelicityAcOutputVoltageSensor(FelicitySolarSensorBase):
     """AC Output voltage sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
+    _rollup_field = "acROutVolt"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Output Voltage"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_output_voltage"
@@ -680,9 +630,11 @@ class FelicityAcOutputVoltageSensor(FelicitySolarSensorBase):
 
 class FelicityAcOutputCurrentSensor(FelicitySolarSensorBase):
     """AC Output current sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "acROutCurr"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Output Current"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_output_current"
@@ -696,9 +648,10 @@ class FelicityAcOutputCurrentSensor(FelicitySolarSensorBase):
 
 class FelicityAcOutputFrequencySensor(FelicitySolarSensorBase):
     """AC Output frequency sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Output Frequency"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_output_frequency"
@@ -712,9 +665,11 @@ class FelicityAcOutputFrequencySensor(FelicitySolarSensorBase):
 
 class FelicityAcOutputPowerSensor(FelicitySolarSensorBase):
     """AC Output power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "acTotalOutActPower"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} AC Output Power"
         self._attr_unique_id = f"felicity_{device_identifier}_ac_output_power"
@@ -729,9 +684,10 @@ class FelicityAcOutputPowerSensor(FelicitySolarSensorBase):
 # Energy Sensors
 class FelicityTotalEnergySensor(FelicitySolarSensorBase):
     """Total energy sensor."""
+    _poll_group = POLL_GROUP_SLOW
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Total Energy"
         self._attr_unique_id = f"felicity_{device_identifier}_total_energy"
@@ -745,9 +701,10 @@ class FelicityTotalEnergySensor(FelicitySolarSensorBase):
 
 class FelicityTodayEnergySensor(FelicitySolarSensorBase):
     """Today energy sensor."""
+    _poll_group = POLL_GROUP_SLOW
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Today Energy"
         self._attr_unique_id = f"felicity_{device_identifier}_today_energy"
@@ -761,9 +718,10 @@ class FelicityTodayEnergySensor(FelicitySolarSensorBase):
 
 class FelicityGridFeedTodaySensor(FelicitySolarSensorBase):
     """Grid feed today sensor."""
+    _poll_group = POLL_GROUP_SLOW
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Grid Feed Today"
         self._attr_unique_id = f"felicity_{device_identifier}_grid_feed_today"
@@ -777,9 +735,10 @@ class FelicityGridFeedTodaySensor(FelicitySolarSensorBase):
 
 class FelicityGridFeedTotalSensor(FelicitySolarSensorBase):
     """Grid feed total sensor."""
+    _poll_group = POLL_GROUP_SLOW
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Grid Feed Total"
         self._attr_unique_id = f"felicity_{device_identifier}_grid_feed_total"
@@ -794,9 +753,10 @@ class FelicityGridFeedTotalSensor(FelicitySolarSensorBase):
 # Temperature Sensors
 class FelicityTempMaxSensor(FelicitySolarSensorBase):
     """Maximum temperature sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Temperature Max"
         self._attr_unique_id = f"felicity_{device_identifier}_temp_max"
@@ -810,9 +770,10 @@ class FelicityTempMaxSensor(FelicitySolarSensorBase):
 
 class FelicityDeviceTempMaxSensor(FelicitySolarSensorBase):
     """Device maximum temperature sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Device Temperature Max"
         self._attr_unique_id = f"felicity_{device_identifier}_device_temp_max"
@@ -827,9 +788,10 @@ class FelicityDeviceTempMaxSensor(FelicitySolarSensorBase):
 # Load & Grid Sensors
 class FelicityLoadPercentSensor(FelicitySolarSensorBase):
     """Load percentage sensor."""
+    _poll_group = POLL_GROUP_FAST
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Load Percentage"
         self._attr_unique_id = f"felicity_{device_identifier}_load_percent"
@@ -842,9 +804,11 @@ class FelicityLoadPercentSensor(FelicitySolarSensorBase):
 
 class FelicityMeterPowerSensor(FelicitySolarSensorBase):
     """Meter power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "meterPower"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Meter Power"
         self._attr_unique_id = f"felicity_{device_identifier}_meter_power"
@@ -859,9 +823,10 @@ class FelicityMeterPowerSensor(FelicitySolarSensorBase):
 # Device Status Sensors
 class FelicityDeviceStatusSensor(FelicitySolarSensorBase):
     """Device status sensor."""
+    _poll_group = POLL_GROUP_SLOW
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Device Status"
         self._attr_unique_id = f"felicity_{device_identifier}_device_status"
@@ -872,9 +837,10 @@ class FelicityDeviceStatusSensor(FelicitySolarSensorBase):
 
 class FelicityWifiSignalSensor(FelicitySolarSensorBase):
     """WiFi signal sensor."""
+    _poll_group = POLL_GROUP_SLOW
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} WiFi Signal"
         self._attr_unique_id = f"felicity_{device_identifier}_wifi_signal"
@@ -889,9 +855,10 @@ class FelicityWifiSignalSensor(FelicitySolarSensorBase):
 # Battery Sensors (only created if battery is present)
 class FelicityBatterySocSensor(FelicitySolarSensorBase):
     """Battery State of Charge sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Battery SOC"
         self._attr_unique_id = f"felicity_{device_identifier}_battery_soc"
@@ -905,9 +872,11 @@ class FelicityBatterySocSensor(FelicitySolarSensorBase):
 
 class FelicityBatteryVoltageSensor(FelicitySolarSensorBase):
     """Battery voltage sensor."""
+    _poll_group = POLL_GROUP_MEDIUM
+    _rollup_field = "battVolt"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Battery Voltage"
         self._attr_unique_id = f"felicity_{device_identifier}_battery_voltage"
@@ -921,9 +890,11 @@ class FelicityBatteryVoltageSensor(FelicitySolarSensorBase):
 
 class FelicityBatteryCurrentSensor(FelicitySolarSensorBase):
     """Battery current sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "battCurr"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Battery Current"
         self._attr_unique_id = f"felicity_{device_identifier}_battery_current"
@@ -937,9 +908,11 @@ class FelicityBatteryCurrentSensor(FelicitySolarSensorBase):
 
 class FelicityBatteryPowerSensor(FelicitySolarSensorBase):
     """Battery power sensor."""
+    _poll_group = POLL_GROUP_FAST
+    _rollup_field = "bmsPower"
     
-    def __init__(self, plant_id: str, auth: FelicitySolarAuth, device_sn: str, device_type: str, scan_interval: int = 30, device_info: dict = None):
-        super().__init__(plant_id, auth, device_sn, device_type, scan_interval, device_info)
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
         device_identifier = self._get_device_identifier()
         self._attr_name = f"{device_identifier} Battery Power"
         self._attr_unique_id = f"felicity_{device_identifier}_battery_power"
@@ -949,4 +922,367 @@ class FelicityBatteryPowerSensor(FelicitySolarSensorBase):
     
     @property
     def native_value(self):
-        return self._get_float_value("bmsPower")
\ No newline at end of file
+        return self._get_float_value("bmsPower")
+
+# Battery Runtime Estimate Sensors
+class FelicityBatteryRuntimeSensorBase(FelicitySolarSensorBase):
+    """Base class for battery runtime estimates, written only when the estimate moves."""
+    _poll_group = POLL_GROUP_ANY
+    
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
+        self._written_revision = None
+        self._attr_native_unit_of_measurement = UnitOfTime.MINUTES
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_state_class = "measurement"
+    
+    def _get_estimator(self):
+        """Get the runtime estimator of this device."""
+        return self._coordinator.battery_estimators.get(self._device_sn)
+    
+    @callback
+    def _handle_snapshot(self, snapshot) -> None:
+        """Write state only when availability or the published estimate changed."""
+        estimator = self._get_estimator()
+        revision = estimator.revision if estimator else None
+        if snapshot is not None and self._attr_available and revision == self._written_revision:
+            self._snapshot_data = snapshot
+            return
+        self._written_revision = revision
+        super()._handle_snapshot(snapshot)
+
+class FelicityBatteryTimeToEmptySensor(FelicityBatteryRuntimeSensorBase):
+    """Estimated time until the battery is empty."""
+    
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
+        device_identifier = self._get_device_identifier()
+        self._attr_name = f"{device_identifier} Battery Time To Empty"
+        self._attr_unique_id = f"felicity_{device_identifier}_battery_time_to_empty"
+    
+    @property
+    def native_value(self):
+        estimator = self._get_estimator()
+        if estimator is None or (estimator.revision == 0 and self._snapshot_data is None):
+            return self._restored_value
+        return estimator.time_to_empty
+
+class FelicityBatteryTimeToFullSensor(FelicityBatteryRuntimeSensorBase):
+    """Estimated time until the battery is full."""
+    
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
+        device_identifier = self._get_device_identifier()
+        self._attr_name = f"{device_identifier} Battery Time To Full"
+        self._attr_unique_id = f"felicity_{device_identifier}_battery_time_to_full"
+    
+    @property
+    def native_value(self):
+        estimator = self._get_estimator()
+        if estimator is None or (estimator.revision == 0 and self._snapshot_data is None):
+            return self._restored_value
+        return estimator.time_to_full
+
+# Rolling Statistic Sensors
+# Snapshot field -> (name, unit, device class)
+ROLLING_STATISTIC_FIELDS = {
+    "pvTotalPower": ("PV Total Power", UnitOfPower.WATT, SensorDeviceClass.POWER),
+    "bmsPower": ("Battery Power", UnitOfPower.WATT, SensorDeviceClass.POWER),
+    "battSoc": ("Battery SOC", PERCENTAGE, SensorDeviceClass.BATTERY),
+    "tempMax": ("Temperature Max", UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE),
+    "devTempMax": ("Device Temperature Max", UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE),
+}
+
+ROLLING_WINDOW_NAMES = {"5min": "5 min", "1h": "1 h"}
+
+class FelicityRollingStatisticSensor(FelicitySolarSensorBase):
+    """Rolling-window min, max or mean of a snapshot field."""
+    _poll_group = POLL_GROUP_ANY
+    # 30 of these per device would bloat the recorder; users enable the ones they chart
+    _attr_entity_registry_enabled_default = False
+    
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict, field: str, window: str, statistic: str):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
+        self._field = field
+        self._window = window
+        self._statistic = statistic
+        name, unit, device_class = ROLLING_STATISTIC_FIELDS[field]
+        device_identifier = self._get_device_identifier()
+        sanitized_id = device_identifier.replace("-", "_").replace(" ", "_").lower()
+        self._attr_name = f"{device_identifier} {name} {ROLLING_WINDOW_NAMES[window]} {statistic.capitalize()}"
+        self._attr_unique_id = f"felicity_{sanitized_id}_{field.lower()}_{window}_{statistic}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        statistics = self._coordinator.statistics.get(self._device_sn)
+        value = statistics.get(self._field, self._window, self._statistic, time.monotonic()) if statistics else None
+        return value if value is not None else self._restored_value
+
+class FelicityPvStringHealthSensor(FelicitySolarSensorBase):
+    """Weakest PV string of a device relative to its own baseline, from the fleet-wide pass."""
+    # Refreshed by the plant aggregation pass that computes the string health, not by polls
+    _poll_group = None
+    
+    def __init__(self, plant_id: str, coordinator: FelicitySolarCoordinator, device_sn: str, device_type: str, device_info: dict = None):
+        super().__init__(plant_id, coordinator, device_sn, device_type, device_info)
+        device_identifier = self._get_device_identifier()
+        sanitized_id = device_identifier.replace("-", "_").replace(" ", "_").lower()
+        self._attr_name = f"{device_identifier} PV String Health"
+        self._attr_unique_id = f"felicity_{sanitized_id}_pv_string_health"
+        self._attr_native_unit_of_measurement = PERCENTAGE
+        self._attr_state_class = "measurement"
+    
+    async def async_added_to_hass(self) -> None:
+        """Refresh after every fleet-wide string health pass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._coordinator.async_add_plant_listener(self._handle_string_health))
+    
+    @callback
+    def _handle_string_health(self) -> None:
+        """Take the device's current snapshot and string health from the finished pass."""
+        self._handle_snapshot(self._coordinator.snapshots.get(self._device_sn))
+    
+    def _get_string_health(self):
+        return self._coordinator.string_health.devices.get(self._device_sn, {})
+    
+    @property
+    def native_value(self):
+        value = self._get_string_health().get("min_health")
+        return value if value is not None else self._restored_value
+    
+    @property
+    def extra_state_attributes(self):
+        """Return the health of every string and the underperforming ones."""
+        string_health = self._get_string_health()
+        return {
+            **super().extra_state_attributes,
+            "strings": string_health.get("health", {}),
+            "underperforming": string_health.get("underperforming", []),
+        }
+
+# Plant Aggregate Sensors
+class FelicityPlantSensorBase(SensorEntity):
+    """Base class for plant aggregate sensors computed from device snapshots."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        self._coordinator = coordinator
+        self._entry_id = entry_id
+        self._plant_id = plant_id
+        self._plant_name = plant_name
+    
+    @property
+    def device_info(self):
+        """Return plant device information."""
+        return {
+            "identifiers": {(DOMAIN, plant_identifier(self._entry_id, self._plant_id))},
+            "name": self._plant_name,
+            "manufacturer": "Felicity Solar",
+            "model": "Plant",
+            "configuration_url": "https://shine.felicityess.com/login"
+        }
+    
+    @property
+    def should_poll(self) -> bool:
+        """Return False, aggregates are pushed by the coordinator."""
+        return False
+    
+    @property
+    def available(self) -> bool:
+        """Return True once the plant has been aggregated."""
+        return self._plant_id in self._coordinator.plant_aggregates
+    
+    @property
+    def extra_state_attributes(self):
+        """Return the number of devices included in the aggregate."""
+        aggregate = self._coordinator.plant_aggregates.get(self._plant_id, {})
+        return {"device_count": aggregate.get("device_count", 0)}
+    
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to plant aggregate updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._coordinator.async_add_plant_listener(self.async_write_ha_state))
+    
+    def _get_aggregate(self, key: str):
+        """Get an aggregate value of this plant."""
+        return self._coordinator.plant_aggregates.get(self._plant_id, {}).get(key)
+
+class FelicityPlantPvPowerSensor(FelicityPlantSensorBase):
+    """Plant total PV power sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} PV Power"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_pv_power"
+        self._attr_native_unit_of_measurement = UnitOfPower.WATT
+        self._attr_device_class = SensorDeviceClass.POWER
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("pv_power")
+
+class FelicityPlantLoadPowerSensor(FelicityPlantSensorBase):
+    """Plant total load power sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Load Power"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_load_power"
+        self._attr_native_unit_of_measurement = UnitOfPower.WATT
+        self._attr_device_class = SensorDeviceClass.POWER
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("load_power")
+
+class FelicityPlantGridPowerSensor(FelicityPlantSensorBase):
+    """Plant total grid input power sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Grid Power"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_grid_power"
+        self._attr_native_unit_of_measurement = UnitOfPower.WATT
+        self._attr_device_class = SensorDeviceClass.POWER
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("grid_power")
+
+class FelicityPlantMeterPowerSensor(FelicityPlantSensorBase):
+    """Plant total meter power sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Meter Power"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_meter_power"
+        self._attr_native_unit_of_measurement = UnitOfPower.WATT
+        self._attr_device_class = SensorDeviceClass.POWER
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("meter_power")
+
+class FelicityPlantBatteryPowerSensor(FelicityPlantSensorBase):
+    """Plant total battery power sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Battery Power"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_battery_power"
+        self._attr_native_unit_of_measurement = UnitOfPower.WATT
+        self._attr_device_class = SensorDeviceClass.POWER
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("battery_power")
+
+class FelicityPlantBatterySocSensor(FelicityPlantSensorBase):
+    """Plant capacity-weighted battery SoC sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Battery SOC"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_battery_soc"
+        self._attr_native_unit_of_measurement = PERCENTAGE
+        self._attr_device_class = SensorDeviceClass.BATTERY
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("battery_soc")
+
+class FelicityPlantTodayEnergySensor(FelicityPlantSensorBase):
+    """Plant today energy sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Today Energy"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_today_energy"
+        self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+        self._attr_device_class = SensorDeviceClass.ENERGY
+        self._attr_state_class = "total_increasing"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("today_energy")
+
+class FelicityPlantTotalEnergySensor(FelicityPlantSensorBase):
+    """Plant total energy sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Total Energy"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_total_energy"
+        self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+        self._attr_device_class = SensorDeviceClass.ENERGY
+        self._attr_state_class = "total"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("total_energy")
+
+class FelicityPlantTempMaxSensor(FelicityPlantSensorBase):
+    """Plant maximum temperature sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Temperature Max"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_temp_max"
+        self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+        self._attr_device_class = SensorDeviceClass.TEMPERATURE
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("temp_max")
+
+class FelicityPlantDeviceTempMaxSensor(FelicityPlantSensorBase):
+    """Plant maximum device temperature sensor."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Device Temperature Max"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_device_temp_max"
+        self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+        self._attr_device_class = SensorDeviceClass.TEMPERATURE
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        return self._get_aggregate("device_temp_max")
+
+class FelicityPlantUnderperformingStringsSensor(FelicityPlantSensorBase):
+    """Number of underperforming PV strings in a plant."""
+    
+    def __init__(self, coordinator: FelicitySolarCoordinator, entry_id: str, plant_id, plant_name: str):
+        super().__init__(coordinator, entry_id, plant_id, plant_name)
+        self._attr_name = f"{plant_name} Underperforming PV Strings"
+        self._attr_unique_id = f"felicity_{entry_id}_plant_{plant_id}_underperforming_strings"
+        self._attr_state_class = "measurement"
+    
+    @property
+    def native_value(self):
+        summary = self._coordinator.string_health.plants.get(self._plant_id, {})
+        if not summary.get("string_count"):
+            # No string can be judged yet, or the plant has too few strings to compare
+            return None
+        return len(summary.get("underperforming", []))
+    
+    @property
+    def extra_state_attributes(self):
+        """Return the underperforming strings and the plant's mean string health."""
+        summary = self._coordinator.string_health.plants.get(self._plant_id, {})
+        return {
+            **super().extra_state_attributes,
+            "strings": summary.get("underperforming", []),
+            "string_count": summary.get("string_count", 0),
+            "mean_health": summary.get("mean_health"),
+        }
\ No newline at end of file
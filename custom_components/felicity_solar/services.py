@@ -0,0 +1,119 @@
+"""Services of the Felicity Solar integration."""
+import asyncio
+import logging
+from typing import List
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from .archive import ARCHIVE_FIELDS
+from .const import (
+    DOMAIN,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_START,
+    ATTR_END,
+    ATTR_FIELDS,
+    SERVICE_REFRESH,
+    SERVICE_QUERY_ARCHIVE,
+)
+from .coordinator import FelicitySolarCoordinator, get_coordinators, plant_identifier
+
+_LOGGER = logging.getLogger(__name__)
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+QUERY_ARCHIVE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        # A list, or a comma separated string such as "pvTotalPower, battSoc"
+        vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list_csv, [vol.In(ARCHIVE_FIELDS)]),
+    }
+)
+
+
+def _resolve_devices(entry_id: str, coordinator: FelicitySolarCoordinator, identifiers: set) -> List[str]:
+    """Return the serials of an entry's coordinator matching device registry identifiers."""
+    device_sns = []
+    for device_sn, device_info in coordinator.devices.items():
+        device_identifier = device_info.get("deviceIdentifier")
+        for identifier in identifiers:
+            if (
+                identifier == plant_identifier(entry_id, device_info.get("plantId"))
+                or (device_identifier and identifier == device_identifier)
+                or identifier.endswith(f"-{device_sn}")
+            ):
+                device_sns.append(device_sn)
+                break
+    return device_sns
+
+
+def _get_device_identifiers(hass: HomeAssistant, device_ids: List[str]) -> set:
+    """Return the integration identifiers of device registry entries."""
+    device_registry = dr.async_get(hass)
+    identifiers = set()
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        if device is None:
+            _LOGGER.warning(f"Unknown device {device_id} in service call")
+            continue
+        identifiers.update(value for domain, value in device.identifiers if domain == DOMAIN)
+    return identifiers
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_handle_refresh(call: ServiceCall) -> None:
+        """Refresh the targeted devices, or every device when nothing is targeted."""
+        coordinators = get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        device_ids = call.data.get(ATTR_DEVICE_ID)
+
+        identifiers = _get_device_identifiers(hass, device_ids) if device_ids else None
+
+        refreshes = []
+        for entry_id, coordinator in coordinators.items():
+            device_sns = None if identifiers is None else _resolve_devices(entry_id, coordinator, identifiers)
+            if device_sns == []:
+                continue
+            refreshes.append(coordinator.async_request_refresh(device_sns))
+
+        if refreshes:
+            await asyncio.gather(*refreshes)
+
+    async def async_handle_query_archive(call: ServiceCall) -> ServiceResponse:
+        """Return the archived snapshots of the targeted devices in a time range."""
+        identifiers = _get_device_identifiers(hass, call.data[ATTR_DEVICE_ID])
+        start = dt_util.as_utc(call.data[ATTR_START]).timestamp()
+        end = dt_util.as_utc(call.data.get(ATTR_END) or dt_util.utcnow()).timestamp()
+
+        devices = {}
+        for entry_id, coordinator in get_coordinators(hass).items():
+            if coordinator.archive is None:
+                continue
+            # Include the snapshots still buffered for the next periodic write
+            await hass.async_add_executor_job(coordinator.archive.flush)
+            for device_sn in _resolve_devices(entry_id, coordinator, identifiers):
+                devices[device_sn] = await hass.async_add_executor_job(
+                    coordinator.archive.query, device_sn, start, end, call.data.get(ATTR_FIELDS)
+                )
+        return {"devices": devices}
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, async_handle_refresh, schema=REFRESH_SCHEMA)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_ARCHIVE,
+        async_handle_query_archive,
+        schema=QUERY_ARCHIVE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,179 @@
+"""Fleet-wide PV string health computed in one vectorized pass per sweep."""
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .util import to_float
+
+# String key -> power snapshot field of that MPPT input
+PV_STRING_FIELDS = {
+    "pv1": "pvPower",
+    "pv2": "pv2Power",
+    "pv3": "pv3Power",
+    "pv4": "pv4Power",
+}
+
+# A string counts as connected once it has produced more than this many watts
+MIN_PRESENT_POWER = 10.0
+
+# Strings are only judged while the plant's median string produces at least this much
+MIN_REFERENCE_POWER = 100.0
+
+# Strings are only judged in plants with at least this many connected strings; with
+# fewer, the median is mostly the string itself and a weak string looks like a cloud
+MIN_PEER_STRINGS = 3
+
+# Time constants (seconds) of the smoothed output share and of its long-term baseline
+SHORT_TIME_CONSTANT = 1800.0
+BASELINE_TIME_CONSTANT = 7 * 86400.0
+
+# A string is underperforming below this fraction of its baseline share...
+UNDERPERFORMING_HEALTH = 0.8
+# ...or when its health is this many robust standard deviations below its plant's median
+OUTLIER_Z_SCORE = -3.5
+
+
+class FleetStringHealth:
+    """Health of every PV string across all devices, as a fleet x string matrix.
+
+    Each string's power is divided by the median string power of its plant, which
+    cancels out irradiance shared by the plant. The share is smoothed and compared
+    with its own long-term baseline, so strings of different sizes are judged against
+    themselves; a robust z-score across the plant flags strings that stand out from
+    their neighbours. All of it runs as array operations over the whole fleet.
+
+    Plants with fewer than ``MIN_PEER_STRINGS`` connected strings are not judged, since
+    their median offers no reference that is independent of the string itself.
+    """
+
+    def __init__(self):
+        self._device_sns: List[str] = []
+        self._short = np.empty((0, len(PV_STRING_FIELDS)))
+        self._baseline = np.empty((0, len(PV_STRING_FIELDS)))
+        self._present = np.zeros((0, len(PV_STRING_FIELDS)), dtype=bool)
+        self._last_timestamp: Optional[float] = None
+        # Device serial -> {"health": {string: percent}, "underperforming": [string], "min_health": percent}
+        self.devices: Dict[str, Dict[str, Any]] = {}
+        # Plant id -> {"underperforming": ["<sn> <string>"], "string_count": n, "mean_health": percent}
+        self.plants: Dict[Any, Dict[str, Any]] = {}
+
+    def update(self, timestamp: float, devices: Dict[str, Dict[str, Any]], snapshots: Dict[str, Dict[str, Any]]) -> None:
+        """Fold the latest snapshots into the string health of every device."""
+        self._ensure_rows(list(devices))
+        strings = list(PV_STRING_FIELDS)
+
+        power = np.array(
+            [[to_float((snapshots.get(device_sn) or {}).get(field), math.nan) for field in PV_STRING_FIELDS.values()]
+             for device_sn in self._device_sns],
+            dtype=float,
+        ).reshape(len(self._device_sns), len(strings))
+        plant_ids = [devices[device_sn].get("plantId") for device_sn in self._device_sns]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self._present |= power > MIN_PRESENT_POWER
+
+            # Median power of the connected strings of each plant, broadcast to its rows
+            reference = np.full(len(self._device_sns), np.nan)
+            peers = np.zeros(len(self._device_sns), dtype=bool)
+            plant_rows = self._plant_rows(plant_ids)
+            for rows in plant_rows.values():
+                if np.count_nonzero(self._present[rows]) < MIN_PEER_STRINGS:
+                    continue
+                peers[rows] = True
+                plant_power = power[rows][self._present[rows]]
+                if plant_power.size and not np.all(np.isnan(plant_power)):
+                    reference[rows] = np.nanmedian(plant_power)
+
+            share = power / reference[:, None]
+            valid = self._present & ~np.isnan(share) & (reference[:, None] >= MIN_REFERENCE_POWER)
+
+            elapsed = 0.0 if self._last_timestamp is None else max(0.0, timestamp - self._last_timestamp)
+            self._last_timestamp = timestamp
+            short_alpha = 1.0 - math.exp(-elapsed / SHORT_TIME_CONSTANT)
+            baseline_alpha = 1.0 - math.exp(-elapsed / BASELINE_TIME_CONSTANT)
+
+            # Start both averages from the first valid share of a string
+            first = valid & np.isnan(self._short)
+            self._short[first] = share[first]
+            self._baseline[first] = share[first]
+            update = valid & ~first
+            self._short[update] += short_alpha * (share[update] - self._short[update])
+
+            # A baseline share of zero or worse cannot be judged against
+            baseline = np.where(self._baseline > 0, self._baseline, np.nan)
+            health = self._short / baseline
+            health[~np.isfinite(health) | ~peers[:, None]] = np.nan
+            z_score = np.full_like(health, np.nan)
+            for rows in plant_rows.values():
+                plant_health = health[rows]
+                if np.all(np.isnan(plant_health)):
+                    continue
+                median = np.nanmedian(plant_health)
+                mad = np.nanmedian(np.abs(plant_health - median))
+                if mad > 0:
+                    z_score[rows] = (plant_health - median) / (1.4826 * mad)
+
+            underperforming = self._present & ((health < UNDERPERFORMING_HEALTH) | (z_score < OUTLIER_Z_SCORE))
+
+            # Learn the baseline only from strings that look healthy, so a failure is not absorbed
+            learn = update & ~underperforming
+            self._baseline[learn] += baseline_alpha * (share[learn] - self._baseline[learn])
+
+        self._publish(strings, plant_ids, plant_rows, health, underperforming)
+
+    def _publish(self, strings: List[str], plant_ids: List[Any], plant_rows: Dict[Any, np.ndarray], health: np.ndarray, underperforming: np.ndarray) -> None:
+        """Convert the arrays into per-device and per-plant results."""
+        health_percent = np.round(health * 100, 1)
+        judged = self._present & ~np.isnan(health)
+
+        self.devices = {}
+        for row, device_sn in enumerate(self._device_sns):
+            string_health = {
+                strings[column]: float(health_percent[row, column])
+                for column in np.flatnonzero(judged[row])
+            }
+            self.devices[device_sn] = {
+                "health": string_health,
+                "underperforming": [strings[column] for column in np.flatnonzero(underperforming[row])],
+                "min_health": min(string_health.values()) if string_health else None,
+            }
+
+        self.plants = {}
+        for plant_id, rows in plant_rows.items():
+            plant_judged = judged[rows]
+            self.plants[plant_id] = {
+                "underperforming": [
+                    f"{self._device_sns[rows[row]]} {strings[column]}"
+                    for row, column in zip(*np.nonzero(underperforming[rows]))
+                ],
+                "string_count": int(plant_judged.sum()),
+                "mean_health": round(float(np.mean(health[rows][plant_judged])) * 100, 1) if plant_judged.any() else None,
+            }
+
+    @staticmethod
+    def _plant_rows(plant_ids: List[Any]) -> Dict[Any, np.ndarray]:
+        """Return the row indexes of every plant."""
+        plant_rows: Dict[Any, List[int]] = {}
+        for row, plant_id in enumerate(plant_ids):
+            plant_rows.setdefault(plant_id, []).append(row)
+        return {plant_id: np.array(rows, dtype=int) for plant_id, rows in plant_rows.items()}
+
+    def _ensure_rows(self, device_sns: List[str]) -> None:
+        """Match the matrix rows to the current devices, keeping learned state."""
+        if device_sns == self._device_sns:
+            return
+        old_rows = {device_sn: row for row, device_sn in enumerate(self._device_sns)}
+        columns = len(PV_STRING_FIELDS)
+        short = np.full((len(device_sns), columns), np.nan)
+        baseline = np.full((len(device_sns), columns), np.nan)
+        present = np.zeros((len(device_sns), columns), dtype=bool)
+        for row, device_sn in enumerate(device_sns):
+            if device_sn in old_rows:
+                short[row] = self._short[old_rows[device_sn]]
+                baseline[row] = self._baseline[old_rows[device_sn]]
+                present[row] = self._present[old_rows[device_sn]]
+        self._device_sns = list(device_sns)
+        self._short = short
+        self._baseline = baseline
+        self._present = present
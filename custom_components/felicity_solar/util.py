@@ -0,0 +1,12 @@
+"""Helpers shared by the snapshot processing modules."""
+from typing import Any, Optional
+
+
+def to_float(value: Any, default: Optional[float] = None) -> Optional[float]:
+    """Convert a snapshot value to float, returning ``default`` for null and malformed values."""
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
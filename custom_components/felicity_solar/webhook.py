@@ -0,0 +1,71 @@
+"""Webhook ingestion of externally collected Felicity Solar snapshots."""
+import logging
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+from homeassistant.components import webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, CONF_WEBHOOK_ID
+from .coordinator import FelicitySolarCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _extract_snapshots(payload: Any) -> List[Dict[str, Any]]:
+    """Return the snapshots contained in a single or batched webhook payload.
+
+    Accepted shapes are a bare snapshot, a raw ``get_device_snapshot`` response
+    (``{"code": 200, "data": {...}}``), a list of either, or ``{"snapshots": [...]}``.
+    """
+    if isinstance(payload, list):
+        snapshots = []
+        for item in payload:
+            snapshots.extend(_extract_snapshots(item))
+        return snapshots
+
+    if not isinstance(payload, dict):
+        return []
+
+    if "snapshots" in payload:
+        return _extract_snapshots(payload["snapshots"])
+
+    if isinstance(payload.get("data"), dict) and "deviceSn" not in payload:
+        return [payload["data"]]
+
+    return [payload]
+
+
+@callback
+def async_register_webhook(hass: HomeAssistant, entry: ConfigEntry, coordinator: FelicitySolarCoordinator) -> None:
+    """Register the entry's webhook and unregister it when the entry unloads."""
+    webhook_id = entry.data[CONF_WEBHOOK_ID]
+
+    async def handle_webhook(hass: HomeAssistant, webhook_id: str, request: web.Request) -> web.Response:
+        """Feed pushed snapshots straight into the coordinator."""
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"error": "invalid JSON"}, status=400)
+
+        accepted = []
+        ignored = []
+        push_devices = coordinator.push_devices
+        for snapshot in _extract_snapshots(payload):
+            device_sn = snapshot.get("deviceSn")
+            # Polled devices would get two competing sources, so only selected devices are fed
+            if device_sn in push_devices and coordinator.async_push_snapshot(device_sn, snapshot):
+                accepted.append(device_sn)
+            else:
+                ignored.append(device_sn)
+
+        if ignored:
+            _LOGGER.debug(f"Ignored webhook snapshots for devices not fed by webhook push: {ignored}")
+
+        return web.json_response({"accepted": accepted, "ignored": ignored})
+
+    webhook.async_register(hass, DOMAIN, entry.title, webhook_id, handle_webhook)
+    entry.async_on_unload(lambda: webhook.async_unregister(hass, webhook_id))
+    _LOGGER.info(f"Snapshot webhook available at {webhook.async_generate_path(webhook_id)}")
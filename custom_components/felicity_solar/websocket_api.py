@@ -0,0 +1,181 @@
+"""Websocket commands delivering consolidated device and plant state to dashboards.
+
+Each message carries every current value of one device or plant, so a power-flow card
+renders once per poll instead of once per entity state change.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN, POLL_GROUP_ANY, ATTR_CONFIG_ENTRY_ID, ATTR_DEVICE_SN, ATTR_PLANT_ID
+from .coordinator import FelicitySolarCoordinator, get_coordinators
+
+# Optional filters shared by both commands; without any, every device and plant is included
+FILTER_SCHEMA = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_DEVICE_SN): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_PLANT_ID): vol.All(cv.ensure_list, [cv.string]),
+}
+
+
+def _device_selected(msg: Dict[str, Any], device_info: Dict[str, Any]) -> bool:
+    """Return True if a device passes the serial and plant filters of a message."""
+    if ATTR_DEVICE_SN in msg and device_info.get("deviceSn") not in msg[ATTR_DEVICE_SN]:
+        return False
+    return ATTR_PLANT_ID not in msg or str(device_info.get("plantId")) in msg[ATTR_PLANT_ID]
+
+
+def _device_message(entry_id: str, coordinator: FelicitySolarCoordinator, device_sn: str) -> Dict[str, Any]:
+    """Return every current value of one device."""
+    device_info = coordinator.devices.get(device_sn, {})
+    last_updated = coordinator.get_last_updated(device_sn)
+    return {
+        "type": "device",
+        "config_entry_id": entry_id,
+        "device_sn": device_sn,
+        "plant_id": device_info.get("plantId"),
+        "plant_name": device_info.get("plantName"),
+        "values": coordinator.snapshots.get(device_sn),
+        "string_health": coordinator.string_health.devices.get(device_sn),
+        "available": device_sn in coordinator.snapshots,
+        "stale": coordinator.is_stale(device_sn),
+        "data_age": coordinator.get_data_age(device_sn),
+        "last_updated": last_updated.isoformat() if last_updated else None,
+    }
+
+
+def _plant_message(entry_id: str, coordinator: FelicitySolarCoordinator, plant_id: Any) -> Dict[str, Any]:
+    """Return the aggregates of one plant with the age of its oldest device data."""
+    device_sns = [
+        device_sn for device_sn, device_info in coordinator.devices.items()
+        if device_info.get("plantId") == plant_id
+    ]
+    data_ages = [age for age in (coordinator.get_data_age(device_sn) for device_sn in device_sns) if age is not None]
+    return {
+        "type": "plant",
+        "config_entry_id": entry_id,
+        "plant_id": plant_id,
+        "plant_name": coordinator.devices[device_sns[0]].get("plantName") if device_sns else None,
+        "devices": device_sns,
+        "aggregates": coordinator.plant_aggregates.get(plant_id),
+        "string_health": coordinator.string_health.plants.get(plant_id),
+        "data_age": max(data_ages) if data_ages else None,
+    }
+
+
+def _selected_plants(msg: Dict[str, Any], coordinator: FelicitySolarCoordinator) -> List[Any]:
+    """Return the plants of a coordinator with at least one selected device."""
+    return list(dict.fromkeys(
+        device_info.get("plantId") for device_info in coordinator.devices.values()
+        if _device_selected(msg, device_info)
+    ))
+
+
+def _state_messages(msg: Dict[str, Any], coordinators: Dict[str, FelicitySolarCoordinator]) -> List[Dict[str, Any]]:
+    """Return one message per selected device and plant."""
+    messages = []
+    for entry_id, coordinator in coordinators.items():
+        messages.extend(
+            _device_message(entry_id, coordinator, device_sn)
+            for device_sn, device_info in coordinator.devices.items()
+            if _device_selected(msg, device_info)
+        )
+        messages.extend(
+            _plant_message(entry_id, coordinator, plant_id)
+            for plant_id in _selected_plants(msg, coordinator)
+        )
+    return messages
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/state", **FILTER_SCHEMA})
+@callback
+def websocket_state(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]) -> None:
+    """Return the current state of every selected device and plant."""
+    connection.send_result(msg["id"], {"messages": _state_messages(msg, get_coordinators(hass, msg.get(ATTR_CONFIG_ENTRY_ID)))})
+
+
+@callback
+def _async_subscribe_coordinator(msg: Dict[str, Any], entry_id: str, coordinator: FelicitySolarCoordinator, send: Callable[[Dict[str, Any]], None]) -> CALLBACK_TYPE:
+    """Forward the device polls and plant sweeps of one coordinator; return the unsubscribe."""
+    device_unsubscribers: Dict[str, CALLBACK_TYPE] = {}
+
+    @callback
+    def _async_subscribe_device(device_sn: str) -> None:
+        @callback
+        def _async_device_updated(snapshot: Optional[Dict[str, Any]]) -> None:
+            if snapshot is None and device_sn not in coordinator.devices:
+                # Removed by rediscovery
+                device_unsubscribers.pop(device_sn)()
+                send({"type": "device_removed", "config_entry_id": entry_id, "device_sn": device_sn})
+            else:
+                # A None snapshot of a known device means its data expired; "values" is then None
+                send(_device_message(entry_id, coordinator, device_sn))
+
+        device_unsubscribers[device_sn] = coordinator.async_add_listener(device_sn, POLL_GROUP_ANY, _async_device_updated)
+
+    @callback
+    def _async_devices_added(devices_info: List[Dict[str, Any]]) -> None:
+        for device_info in devices_info:
+            if _device_selected(msg, device_info):
+                _async_subscribe_device(device_info["deviceSn"])
+
+    @callback
+    def _async_plants_updated() -> None:
+        for plant_id in _selected_plants(msg, coordinator):
+            send(_plant_message(entry_id, coordinator, plant_id))
+
+    for device_sn, device_info in coordinator.devices.items():
+        if _device_selected(msg, device_info):
+            _async_subscribe_device(device_sn)
+    unsubscribe_devices = coordinator.async_add_devices_listener(_async_devices_added)
+    unsubscribe_plants = coordinator.async_add_plant_listener(_async_plants_updated)
+
+    @callback
+    def _async_unsubscribe() -> None:
+        unsubscribe_devices()
+        unsubscribe_plants()
+        for unsubscribe in device_unsubscribers.values():
+            unsubscribe()
+
+    return _async_unsubscribe
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/subscribe", **FILTER_SCHEMA})
+@callback
+def websocket_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]) -> None:
+    """Send the current state, then one message per device poll and per plant sweep.
+
+    The subscription covers the entries loaded when it starts; clients resubscribe
+    after an entry reloads.
+    """
+    coordinators = get_coordinators(hass, msg.get(ATTR_CONFIG_ENTRY_ID))
+
+    @callback
+    def _async_send(message: Dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], message))
+
+    unsubscribers = [
+        _async_subscribe_coordinator(msg, entry_id, coordinator, _async_send)
+        for entry_id, coordinator in coordinators.items()
+    ]
+
+    @callback
+    def _async_unsubscribe() -> None:
+        for unsubscribe in unsubscribers:
+            unsubscribe()
+
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+    for message in _state_messages(msg, coordinators):
+        _async_send(message)
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, websocket_state)
+    websocket_api.async_register_command(hass, websocket_subscribe)
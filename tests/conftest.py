@@ -0,0 +1,5 @@
+"""Make the integration importable as ``custom_components.felicity_solar``."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
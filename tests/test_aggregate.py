@@ -0,0 +1,50 @@
+"""Tests for the plant aggregates."""
+from custom_components.felicity_solar.aggregate import compute_plant_aggregates
+
+DEVICES = {
+    "A": {"plantId": 1, "batteryCapacity": 10},
+    "B": {"plantId": 1, "batteryCapacity": 30},
+    "C": {"plantId": 2},
+}
+
+
+def test_sums_max_and_capacity_weighted_soc():
+    snapshots = {
+        "A": {"pvTotalPower": "1000", "battSoc": 40, "tempMax": 30, "ePvToday": 2.0, "totalEnergy": 100},
+        "B": {"pvTotalPower": 500, "battSoc": 80, "tempMax": 45, "ePvToday": 1.0, "totalEnergy": 50},
+        "C": {"pvTotalPower": 200},
+    }
+    aggregates = compute_plant_aggregates(DEVICES, snapshots)
+
+    assert aggregates[1]["pv_power"] == 1500
+    assert aggregates[1]["temp_max"] == 45
+    assert aggregates[1]["battery_soc"] == 70.0
+    assert aggregates[1]["today_energy"] == 3.0
+    assert aggregates[1]["total_energy"] == 150
+    assert aggregates[1]["device_count"] == 2
+    # Fields no device reports stay unknown instead of a false zero
+    assert aggregates[2]["load_power"] is None
+    assert aggregates[2]["battery_soc"] is None
+
+
+def test_stale_devices_keep_only_their_energy_counters():
+    snapshots = {
+        "A": {"pvTotalPower": 1000, "ePvToday": 2.0, "totalEnergy": 100},
+        "B": {"pvTotalPower": 500, "ePvToday": 1.0, "totalEnergy": 50},
+    }
+    aggregates = compute_plant_aggregates(DEVICES, snapshots, stale={"B"})
+
+    assert aggregates[1]["pv_power"] == 1000
+    assert aggregates[1]["device_count"] == 1
+    assert aggregates[1]["today_energy"] == 3.0
+    assert aggregates[1]["total_energy"] == 150
+
+
+def test_energy_counters_unknown_while_a_device_has_no_snapshot():
+    snapshots = {"A": {"pvTotalPower": 1000, "ePvToday": 2.0, "totalEnergy": 100}}
+    aggregates = compute_plant_aggregates(DEVICES, snapshots)
+
+    assert aggregates[1]["pv_power"] == 1000
+    assert aggregates[1]["today_energy"] is None
+    assert aggregates[1]["total_energy"] is None
+    assert 2 not in aggregates
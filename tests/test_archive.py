@@ -0,0 +1,36 @@
+"""Tests for the snapshot archive."""
+import os
+from datetime import datetime, timezone
+
+from custom_components.felicity_solar.archive import SnapshotArchive
+
+DAY = datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp()
+
+
+def test_flush_and_query_across_segments(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    archive.append("A", DAY - 60, {"pvTotalPower": 100})
+    archive.append("A", DAY + 60, {"pvTotalPower": "200", "battSoc": 50})
+    archive.append("A", DAY + 120, {"battSoc": 51})
+
+    assert archive.flush() == 3
+    assert sorted(os.listdir(tmp_path / "A")) == ["2024-05-31", "2024-06-01"]
+
+    result = archive.query("A", DAY - 3600, DAY + 120, ["pvTotalPower", "battSoc", "notArchived"])
+    assert len(result["timestamps"]) == 2
+    assert result["fields"] == {"pvTotalPower": [100.0, 200.0], "battSoc": [None, 50.0]}
+
+
+def test_query_of_unknown_device_is_empty(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+
+    assert archive.query("missing", DAY, DAY + 60, ["battSoc"]) == {"timestamps": [], "fields": {"battSoc": []}}
+
+
+def test_retention_expires_old_segments(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), retention_days=7)
+    archive.append("A", DAY, {"battSoc": 50})
+    archive.append("A", datetime.now(timezone.utc).timestamp(), {"battSoc": 60})
+    archive.flush()
+
+    assert len(os.listdir(tmp_path / "A")) == 1
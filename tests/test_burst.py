@@ -0,0 +1,34 @@
+"""Tests for burst triggers and snapshot changes."""
+from custom_components.felicity_solar.burst import BURST_DECAY_FACTOR, BurstState, detect_burst_triggers
+from custom_components.felicity_solar.changes import diff_snapshots
+
+
+def test_load_triggers_only_when_crossing_the_threshold():
+    assert detect_burst_triggers(None, {"loadPercent": 90}, 80) == ["load"]
+    assert detect_burst_triggers({"loadPercent": 70}, {"loadPercent": 90}, 80) == ["load"]
+    assert detect_burst_triggers({"loadPercent": 85}, {"loadPercent": 90}, 80) == []
+
+
+def test_transition_triggers():
+    previous = {"acRInVolt": 230, "status": "normal", "battCurr": 5}
+    snapshot = {"acRInVolt": 180, "status": "fault", "battCurr": -5}
+
+    assert detect_burst_triggers(previous, snapshot, 80) == ["grid_voltage_drop", "status_change", "battery_direction"]
+    # Currents inside the deadband have no direction to flip
+    assert detect_burst_triggers({"battCurr": 0.2}, {"battCurr": -5}, 80) == []
+
+
+def test_burst_interval_decays_after_the_window():
+    burst = BurstState(5, until=100)
+    burst.advance(50)
+    assert burst.interval == 5
+    burst.advance(100)
+    assert burst.interval == 5 * BURST_DECAY_FACTOR
+
+
+def test_diff_snapshots():
+    assert diff_snapshots(None, {"status": "normal"}) == {}
+    assert diff_snapshots({"status": "normal", "a": 1}, {"status": "fault", "a": 1, "b": 2}) == {
+        "status": {"old": "normal", "new": "fault"},
+        "b": {"old": None, "new": 2},
+    }
@@ -0,0 +1,79 @@
+"""Tests for recording and replaying API traffic."""
+import asyncio
+import json
+
+import pytest
+
+from custom_components.felicity_solar import cassette
+from custom_components.felicity_solar.cassette import REDACTED, CassetteRecorder, CassetteReplaySession, redact
+from custom_components.felicity_solar.client import FelicitySolarApiError, FelicitySolarClient
+from custom_components.felicity_solar.const import DEVICE_SNAPSHOT_ENDPOINT, LOGIN_ENDPOINT, PLANT_LIST_ENDPOINT
+
+PLANT_LIST = {
+    "code": 200,
+    "data": {"dataList": [{"id": 1, "plantName": "Home", "plantDeviceList": [{"deviceSn": "SN1", "deviceType": "OC"}]}]},
+}
+
+
+def _write_cassette(path):
+    exchanges = [
+        {"t": 1000.0, "endpoint": LOGIN_ENDPOINT, "request": {}, "response": {"code": 200, "data": {"token": REDACTED}}},
+        {"t": 1000.0, "endpoint": PLANT_LIST_ENDPOINT, "request": {}, "response": PLANT_LIST},
+    ] + [
+        {
+            "t": 1000.0 + offset,
+            "endpoint": DEVICE_SNAPSHOT_ENDPOINT,
+            "request": {"deviceSn": "SN1"},
+            "response": {"code": 200, "data": {"deviceSn": "SN1", "battSoc": soc}},
+        }
+        for offset, soc in ((0, 50), (60, 51), (120, 52))
+    ]
+    path.write_text("".join(json.dumps(exchange) + "\n" for exchange in exchanges))
+
+
+def test_redact_replaces_secrets_at_any_depth():
+    assert redact({"token": "abc", "data": [{"email": "a@b", "battSoc": 50, "phone": ""}]}) == {
+        "token": REDACTED,
+        "data": [{"email": REDACTED, "battSoc": 50, "phone": ""}],
+    }
+
+
+def test_recorder_writes_redacted_lines(tmp_path):
+    recorder = CassetteRecorder(str(tmp_path / "cassette.jsonl"))
+    recorder.record(LOGIN_ENDPOINT, {"userName": "me", "password": "secret"}, {"code": 200, "data": {"token": "t"}})
+    recorder.close()
+    # Exchanges after closing are dropped instead of raising
+    recorder.record(LOGIN_ENDPOINT, {}, {})
+
+    lines = (tmp_path / "cassette.jsonl").read_text().splitlines()
+    assert len(lines) == 1
+    exchange = json.loads(lines[0])
+    assert exchange["request"] == {"userName": REDACTED, "password": REDACTED}
+    assert exchange["response"]["data"]["token"] == REDACTED
+
+
+def test_replay_through_the_client(tmp_path, monkeypatch):
+    path = tmp_path / "cassette.jsonl"
+    _write_cassette(path)
+    clock = [0.0]
+    monkeypatch.setattr(cassette.time, "monotonic", lambda: clock[0])
+    session = CassetteReplaySession(str(path), speed=10, multiplier=2)
+
+    async def run():
+        client = FelicitySolarClient("user", "secret", session=session)
+        devices = await client.get_devices_info()
+        assert [device["deviceSn"] for device in devices] == ["SN1", "SN1-R001"]
+
+        assert (await client.get_device_snapshot("SN1"))["battSoc"] == 50
+        # Speed samples the recording: 11.9 seconds at 10x are 119 seconds into it
+        clock[0] = 11.9
+        snapshot = await client.get_device_snapshot("SN1-R001")
+        assert snapshot == {"deviceSn": "SN1-R001", "battSoc": 51}
+        # The replay loops at the end of the recording
+        clock[0] = 12.5
+        assert (await client.get_device_snapshot("SN1"))["battSoc"] == 50
+
+        with pytest.raises(FelicitySolarApiError):
+            await client.get_device_snapshot("UNKNOWN")
+
+    asyncio.run(run())
@@ -0,0 +1,80 @@
+"""Tests for the API client against a local stand-in server."""
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.felicity_solar.client import (
+    FelicitySolarApiError,
+    FelicitySolarAuthError,
+    FelicitySolarClient,
+)
+from custom_components.felicity_solar.const import DEVICE_SNAPSHOT_ENDPOINT, LOGIN_ENDPOINT
+
+
+def _run_with_server(password, token_uses, check):
+    """Serve login and snapshots, rejecting the n-th token after ``token_uses[n]`` snapshot requests."""
+    state = {"logins": 0, "uses": 0}
+
+    async def login(request):
+        body = await request.json()
+        if body["password"] != password:
+            return web.json_response({"code": 500, "message": "wrong password"})
+        state["logins"] += 1
+        state["uses"] = 0
+        return web.json_response({"code": 200, "data": {"token": f"t{state['logins']}"}})
+
+    async def snapshot(request):
+        if request.headers.get("Authorization") != f"t{state['logins']}" or state["uses"] >= token_uses[state["logins"] - 1]:
+            return web.json_response({"code": 401, "message": "token expired"})
+        state["uses"] += 1
+        body = await request.json()
+        return web.json_response({"code": 200, "data": {"deviceSn": body["deviceSn"], "battSoc": 50}})
+
+    async def run():
+        app = web.Application()
+        app.router.add_post(LOGIN_ENDPOINT, login)
+        app.router.add_post(DEVICE_SNAPSHOT_ENDPOINT, snapshot)
+        async with TestServer(app) as server:
+            async with FelicitySolarClient("user", "secret", base_url=str(server.make_url(""))) as client:
+                await check(client)
+        return state
+
+    return asyncio.run(run())
+
+
+def test_logs_in_again_when_the_token_expires():
+    async def check(client):
+        for _ in range(5):
+            assert (await client.get_device_snapshot("SN1"))["deviceSn"] == "SN1"
+
+    state = _run_with_server("secret", [2, 2, 2], check)
+    assert state["logins"] == 3
+
+
+def test_concurrent_rejections_share_one_login():
+    async def check(client):
+        await client.get_device_snapshot("SN1")
+        results = await asyncio.gather(*(client.get_device_snapshot(f"SN{index}") for index in range(4)))
+        assert all(results)
+
+    state = _run_with_server("secret", [1, 10], check)
+    assert state["logins"] == 2
+
+
+def test_rejected_login_raises_auth_error():
+    async def check(client):
+        with pytest.raises(FelicitySolarAuthError):
+            await client.get_device_snapshot("SN1")
+
+    _run_with_server("other", [2], check)
+
+
+def test_unreachable_server_raises_api_error():
+    async def run():
+        async with FelicitySolarClient("user", "secret", base_url="http://127.0.0.1:9") as client:
+            with pytest.raises(FelicitySolarApiError):
+                await client.login()
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+"""Tests for the polling scheduler of the coordinator."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from custom_components.felicity_solar.const import (
+    CONF_RELAY,
+    CONF_REPLAY_SPEED,
+    CONF_UPSTREAM_RELAY_URL,
+    POLL_GROUP_FAST,
+    POLL_GROUP_MEDIUM,
+    POLL_GROUP_SLOW,
+)
+from custom_components.felicity_solar.coordinator import (
+    FelicitySolarCoordinator,
+    get_reload_options,
+    plant_identifier,
+)
+
+INTERVALS = {POLL_GROUP_FAST: 30, POLL_GROUP_MEDIUM: 120, POLL_GROUP_SLOW: 600}
+
+
+def _coordinator(*device_sns, **kwargs):
+    """Return a coordinator that is not running, so it never arms Home Assistant timers."""
+    devices_info = [{"deviceSn": device_sn, "plantId": 1} for device_sn in device_sns]
+    return FelicitySolarCoordinator(None, None, devices_info, INTERVALS, **kwargs)
+
+
+def _due_groups(coordinator, due_in):
+    """Fire the timer with the groups of device A due after the given seconds."""
+    polls = []
+    coordinator._async_begin_poll = lambda device_sn, groups, now: polls.append((device_sn, sorted(groups)))
+    now = time.monotonic()
+    coordinator._next_due["A"] = {group: now + delay for group, delay in due_in.items()}
+    coordinator._handle_timer(None)
+    return polls
+
+
+def test_groups_due_before_the_next_fast_poll_are_merged():
+    coordinator = _coordinator("A")
+    polls = _due_groups(coordinator, {POLL_GROUP_FAST: 0, POLL_GROUP_MEDIUM: 20, POLL_GROUP_SLOW: 200})
+
+    assert polls == [("A", [POLL_GROUP_FAST, POLL_GROUP_MEDIUM])]
+
+
+def test_nothing_is_polled_before_a_group_is_due():
+    coordinator = _coordinator("A")
+    polls = _due_groups(coordinator, {POLL_GROUP_FAST: 5, POLL_GROUP_MEDIUM: 20, POLL_GROUP_SLOW: 200})
+
+    assert polls == []
+
+
+def test_returning_push_devices_resume_polling_only_if_still_configured():
+    coordinator = _coordinator("A", push_devices={"A", "GONE"})
+    coordinator.async_set_push_devices(set())
+
+    assert "GONE" not in coordinator._next_due
+    assert all(coordinator._next_due["A"].values())
+    assert coordinator.push_devices == frozenset()
+
+
+def test_device_removed_while_waiting_for_a_request_slot_is_skipped():
+    async def run():
+        coordinator = _coordinator("A", max_in_flight=1)
+        fetched = []
+
+        async def fetch(device_sn):
+            fetched.append(device_sn)
+
+        coordinator._async_fetch_snapshot = fetch
+        async with coordinator._request_slots:
+            task = asyncio.ensure_future(coordinator._async_poll_device("A", [POLL_GROUP_FAST]))
+            await asyncio.sleep(0)
+            del coordinator.devices["A"]
+        await task
+        assert fetched == []
+
+    asyncio.run(run())
+
+
+def test_reload_options_ignore_saved_defaults():
+    unset = SimpleNamespace(options={})
+    defaults = SimpleNamespace(options={CONF_RELAY: False, CONF_UPSTREAM_RELAY_URL: "", CONF_REPLAY_SPEED: 1})
+    changed = SimpleNamespace(options={CONF_UPSTREAM_RELAY_URL: "http://relay"})
+
+    assert get_reload_options(unset) == get_reload_options(defaults)
+    assert get_reload_options(unset) != get_reload_options(changed)
+
+
+def test_plant_identifier_is_scoped_to_the_entry():
+    assert plant_identifier("entry1", 7) != plant_identifier("entry2", 7)
@@ -0,0 +1,39 @@
+"""Tests for the battery runtime estimator."""
+import pytest
+
+from custom_components.felicity_solar.estimator import BatteryRuntimeEstimator
+
+
+def test_discharge_estimates_time_to_empty():
+    estimator = BatteryRuntimeEstimator()
+    # 6% per hour from 60%: ten hours to empty
+    for minute in range(0, 31, 5):
+        estimator.add_sample(minute * 60, 60 - minute * 0.1, power=-500)
+
+    assert estimator.time_to_full is None
+    assert estimator.time_to_empty == pytest.approx(570, rel=0.02)
+
+
+def test_idle_battery_has_no_estimate():
+    estimator = BatteryRuntimeEstimator()
+    for minute in range(0, 31, 5):
+        estimator.add_sample(minute * 60, 60 - minute * 0.1, power=10)
+
+    assert estimator.time_to_empty is None
+    assert estimator.time_to_full is None
+
+
+@pytest.mark.parametrize(
+    ("old", "new", "expected"),
+    [
+        (None, 10.0, True),
+        (10.0, None, True),
+        # Long estimates publish after 2 minutes although that is below 5%
+        (600.0, 603.0, True),
+        # Short estimates publish after 5% although that is below 2 minutes
+        (10.0, 10.6, True),
+        (100.0, 101.0, False),
+    ],
+)
+def test_publishes_past_either_threshold(old, new, expected):
+    assert BatteryRuntimeEstimator._should_publish(old, new) is expected
@@ -0,0 +1,28 @@
+"""Tests for the rolling window statistics."""
+from custom_components.felicity_solar.rolling import DeviceRollingStatistics, RollingWindow
+
+
+def test_window_min_max_mean_and_expiry():
+    window = RollingWindow(300)
+    for timestamp, value in ((0, 5.0), (100, 1.0), (200, 9.0), (250, 3.0)):
+        window.add(timestamp, value)
+
+    assert (window.min, window.max, window.mean) == (1.0, 9.0, 4.5)
+
+    # The first two samples leave the window
+    window.expire(450)
+    assert (window.min, window.max, window.mean) == (3.0, 9.0, 6.0)
+
+    window.expire(1000)
+    assert (window.min, window.max, window.mean) == (None, None, None)
+
+
+def test_device_statistics_skip_missing_fields():
+    statistics = DeviceRollingStatistics()
+    statistics.add_snapshot(0, {"pvTotalPower": "100", "battSoc": None})
+    statistics.add_snapshot(60, {"pvTotalPower": 200})
+
+    assert statistics.get("pvTotalPower", "5min", "mean", 60) == 150
+    assert statistics.get("battSoc", "1h", "max", 60) is None
+    assert statistics.get("pvTotalPower", "5min", "min", 400) is None
+    assert statistics.get("pvTotalPower", "1h", "min", 400) == 100
@@ -0,0 +1,18 @@
+"""Tests for the service schemas."""
+import pytest
+import voluptuous as vol
+
+from custom_components.felicity_solar.services import QUERY_ARCHIVE_SCHEMA
+
+
+@pytest.mark.parametrize("fields", ["pvTotalPower, battSoc", ["pvTotalPower", "battSoc"]])
+def test_query_archive_accepts_field_lists(fields):
+    data = QUERY_ARCHIVE_SCHEMA({"device_id": "abc", "start": "2024-06-01 00:00:00", "fields": fields})
+
+    assert data["fields"] == ["pvTotalPower", "battSoc"]
+    assert data["device_id"] == ["abc"]
+
+
+def test_query_archive_rejects_unknown_fields():
+    with pytest.raises(vol.Invalid):
+        QUERY_ARCHIVE_SCHEMA({"device_id": "abc", "start": "2024-06-01 00:00:00", "fields": "pvTotalPower, nope"})
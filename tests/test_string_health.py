@@ -0,0 +1,44 @@
+"""Tests for the fleet-wide PV string health."""
+from custom_components.felicity_solar.string_health import FleetStringHealth
+
+
+def _run(devices, snapshot_at, hours=2):
+    string_health = FleetStringHealth()
+    for timestamp in range(0, hours * 3600, 60):
+        string_health.update(timestamp, devices, snapshot_at(timestamp))
+    return string_health
+
+
+def test_flags_a_string_that_drops_against_its_peers():
+    devices = {"A": {"plantId": 1}, "B": {"plantId": 1}}
+    string_health = _run(devices, lambda timestamp: {
+        "A": {"pvPower": 1000, "pv2Power": 1000 if timestamp < 3600 else 300},
+        "B": {"pvPower": 1000, "pv2Power": 1000},
+    })
+
+    assert string_health.devices["A"]["underperforming"] == ["pv2"]
+    assert string_health.devices["A"]["min_health"] < 80
+    assert string_health.devices["B"]["underperforming"] == []
+    assert string_health.plants[1]["underperforming"] == ["A pv2"]
+    assert string_health.plants[1]["string_count"] == 4
+
+
+def test_plant_with_too_few_strings_is_not_judged():
+    devices = {"A": {"plantId": 1}}
+    string_health = _run(devices, lambda timestamp: {
+        "A": {"pvPower": 1000, "pv2Power": 1000 if timestamp < 3600 else 300},
+    })
+
+    assert string_health.devices["A"] == {"health": {}, "underperforming": [], "min_health": None}
+    assert string_health.plants[1]["string_count"] == 0
+    assert string_health.plants[1]["mean_health"] is None
+
+
+def test_shared_irradiance_changes_are_not_flagged():
+    devices = {"A": {"plantId": 1}, "B": {"plantId": 1}}
+    string_health = _run(devices, lambda timestamp: {
+        device_sn: {"pvPower": 1000 if timestamp < 3600 else 400, "pv2Power": 500 if timestamp < 3600 else 200}
+        for device_sn in devices
+    })
+
+    assert string_health.plants[1]["underperforming"] == []